@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Rows-per-second benchmark of the bulk profile mode (profile_bulk.py).
+
+Writes a random user export (1M rows by default) as CSV and NDJSON to a
+temporary directory, times converting each to profiles (discarding the
+output), and times classifying the life stages alone: the vectorized
+searchsorted lookup against calling generate_profile from mini-profile.py
+once per row.
+
+Usage:
+    python bench_profile_bulk.py [--rows 1000000] [--json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+import profile_bulk
+
+HOBBIES = ("chess", "tennis", "painting", "hiking", "reading", "music", "cooking", "coding")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the bulk profile mode")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Users in the generated export")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    if args.rows < 1:
+        parser.error("--rows must be at least 1")
+    return args
+
+
+def load_generate_profile():
+    """generate_profile from mini-profile.py (not importable by name)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mini-profile.py")
+    spec = importlib.util.spec_from_file_location("mini_profile", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.generate_profile
+
+
+def random_users(rows, seed):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield f"User {i}", rng.randint(1940, 2025), rng.sample(HOBBIES, rng.randint(0, 3))
+
+
+def write_exports(directory, rows, seed):
+    csv_path = os.path.join(directory, "users.csv")
+    ndjson_path = os.path.join(directory, "users.ndjson")
+    with open(csv_path, "w", encoding="utf-8") as csv_file, \
+            open(ndjson_path, "w", encoding="utf-8") as ndjson_file:
+        csv_file.write("name,birth_year,hobbies\n")
+        for name, birth_year, hobbies in random_users(rows, seed):
+            csv_file.write(f"{name},{birth_year},{';'.join(hobbies)}\n")
+            ndjson_file.write(json.dumps({"name": name, "birth_year": birth_year, "hobbies": hobbies}) + "\n")
+    return {"csv": csv_path, "ndjson": ndjson_path}
+
+
+def time_convert(path, input_format, output_format):
+    start = time.perf_counter()
+    with open(path, encoding="utf-8", newline="") as lines, open(os.devnull, "w") as out:
+        profile_bulk.convert(lines, out, input_format, output_format)
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    generate_profile = load_generate_profile()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_exports(directory, args.rows, args.seed)
+        conversions = {
+            f"{input_format}_to_{output_format}": time_convert(paths[input_format], input_format, output_format)
+            for input_format in profile_bulk.FORMATS
+            for output_format in profile_bulk.FORMATS
+        }
+
+    ages = np.random.default_rng(args.seed).integers(-5, 90, size=args.rows)
+    start = time.perf_counter()
+    stages = profile_bulk.classify_ages(ages)
+    vectorized_seconds = time.perf_counter() - start
+
+    age_list = ages.tolist()
+    start = time.perf_counter()
+    expected = [generate_profile(age) for age in age_list]
+    python_seconds = time.perf_counter() - start
+    assert stages.tolist() == expected, "vectorized stages differ from generate_profile"
+
+    report = {
+        "rows": args.rows,
+        "rows_per_second": {name: round(args.rows / seconds) for name, seconds in conversions.items()},
+        "classify_rows_per_second": {
+            "searchsorted": round(args.rows / vectorized_seconds),
+            "generate_profile": round(args.rows / python_seconds),
+        },
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 {args.rows:,} users")
+    for name, rate in report["rows_per_second"].items():
+        print(f"  {name:<22} {rate:>14,} rows/s")
+    print("  life stage classification:")
+    for name, rate in report["classify_rows_per_second"].items():
+        print(f"  {name:<22} {rate:>14,} rows/s")
+
+
+if __name__ == "__main__":
+    main()
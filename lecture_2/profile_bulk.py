@@ -0,0 +1,246 @@
+"""
+Bulk profile generation for mini-profile.
+
+Streams name / birth year / hobbies records from CSV or NDJSON, computes
+ages from the current year and writes one profile summary per record
+({"name", "age", "stage", "hobbies"}, as built by mini-profile.py) as
+NDJSON or CSV. Records are processed in batches: the life stages of a
+whole batch are looked up at once with numpy.searchsorted over the stage
+boundaries, and each batch is written before the next is read, so memory
+stays constant whatever the file size.
+
+Input formats, one record per line:
+    csv     header with "name", "birth_year" and optional "hobbies"
+            columns; hobbies are separated by ";"
+    ndjson  {"name": "Alice", "birth_year": 1990, "hobbies": ["chess", "tennis"]}
+
+Usage:
+    python profile_bulk.py users.csv -o profiles.ndjson
+    cat users.ndjson | python profile_bulk.py - -f ndjson --output-format csv
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+from datetime import date
+from itertools import islice
+
+import numpy as np
+
+FORMATS = ("csv", "ndjson")
+
+EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+# Ages from STAGE_BOUNDARIES[i - 1] up to STAGE_BOUNDARIES[i] get STAGE_LABELS[i]:
+# 0-12 Child, 13-19 Teenager, 20 and older Adult. Birth years are checked
+# against MIN_BIRTH_YEAR and the current year, so ages are never negative and
+# the first label only fills index 0 of searchsorted.
+STAGE_BOUNDARIES = np.array([0, 13, 20])
+STAGE_LABELS = np.array(["Adult", "Child", "Teenager", "Adult"])
+
+# Records classified and written at once
+BATCH_SIZE = 65536
+
+HOBBY_SEPARATOR = ";"
+
+# Birth years accepted, up to the year the ages are computed for; anything
+# else is a typo (and a huge year would overflow the int64 ages)
+MIN_BIRTH_YEAR = 1900
+
+
+def detect_format(path, default="csv"):
+    """Format from the file extension"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def classify_ages(ages):
+    """Life stage of every age, same rule as generate_profile"""
+    return STAGE_LABELS[np.searchsorted(STAGE_BOUNDARIES, ages, side="right")]
+
+
+def parse_year(value):
+    """Birth year as an int, or None if it isn't an integer"""
+    if type(value) is str:
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return value if type(value) is int else None
+
+
+def parse_hobbies(value):
+    """Hobbies as a list, from a list or a ";"-separated string"""
+    if isinstance(value, list):
+        return [str(hobby) for hobby in value]
+    if isinstance(value, str):
+        return [hobby.strip() for hobby in value.split(HOBBY_SEPARATOR) if hobby.strip()]
+    return []
+
+
+def read_csv(lines):
+    """
+    Yield (name, birth year, hobbies) records from CSV lines with a header.
+
+    Raises:
+        ValueError: If the header lacks the name or birth_year column
+    """
+    reader = csv.reader(lines)
+    columns = [column.strip().lower() for column in next(reader, [])]
+    try:
+        name_column, year_column = columns.index("name"), columns.index("birth_year")
+    except ValueError:
+        raise ValueError("CSV input needs a header with 'name' and 'birth_year' columns")
+    hobbies_column = columns.index("hobbies") if "hobbies" in columns else None
+    width = max(name_column, year_column, -1 if hobbies_column is None else hobbies_column) + 1
+
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        hobbies = row[hobbies_column] if hobbies_column is not None else ""
+        yield row[name_column].strip(), parse_year(row[year_column]), parse_hobbies(hobbies)
+
+
+def read_ndjson(lines):
+    """Yield (name, birth year, hobbies) records from NDJSON lines"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield "", None, []
+            continue
+        if not isinstance(record, dict):
+            yield "", None, []
+            continue
+
+        name = record.get("name")
+        yield (
+            name.strip() if isinstance(name, str) else "",
+            parse_year(record.get("birth_year")),
+            parse_hobbies(record.get("hobbies")),
+        )
+
+
+def profile_batches(records, current_year, counts, batch_size=BATCH_SIZE):
+    """
+    Turn records into profiles, one batch at a time.
+
+    Records without a name or an integer birth year from MIN_BIRTH_YEAR to
+    current_year are skipped and counted in counts["invalid"];
+    counts["profiles"] counts the rest.
+
+    Yields:
+        list: Profile dicts of one batch, in input order
+    """
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        valid = [
+            record for record in batch
+            if record[0] and record[1] is not None and MIN_BIRTH_YEAR <= record[1] <= current_year
+        ]
+        counts["invalid"] += len(batch) - len(valid)
+        counts["profiles"] += len(valid)
+        if not valid:
+            continue
+
+        ages = current_year - np.fromiter((record[1] for record in valid), dtype=np.int64, count=len(valid))
+        stages = classify_ages(ages)
+        yield [
+            {"name": name, "age": age, "stage": stage, "hobbies": hobbies}
+            for (name, _, hobbies), age, stage in zip(valid, ages.tolist(), stages.tolist())
+        ]
+
+
+def write_ndjson(batches, out):
+    # One encoder for all rows: json.dumps with options builds a new one per call
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    for profiles in batches:
+        out.write("".join(encode(profile) + "\n" for profile in profiles))
+
+
+def write_csv(batches, out):
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["name", "age", "stage", "hobbies"])
+    for profiles in batches:
+        writer.writerows(
+            (profile["name"], profile["age"], profile["stage"], HOBBY_SEPARATOR.join(profile["hobbies"]))
+            for profile in profiles
+        )
+
+
+def convert(lines, out, input_format="csv", output_format="ndjson", current_year=None,
+            batch_size=BATCH_SIZE):
+    """
+    Stream profiles for the records in lines to out.
+
+    Args:
+        lines (iterable): Text lines of the input
+        out (file): Text stream the profiles are written to
+        input_format (str): "csv" or "ndjson"
+        output_format (str): "csv" or "ndjson"
+        current_year (int): Year the ages are computed for, this year by default
+        batch_size (int): Records classified and written at once
+
+    Returns:
+        dict: Number of "profiles" written and of "invalid" records skipped
+    """
+    if current_year is None:
+        current_year = date.today().year
+
+    records = read_csv(lines) if input_format == "csv" else read_ndjson(lines)
+    counts = {"profiles": 0, "invalid": 0}
+    batches = profile_batches(records, current_year, counts, batch_size)
+    if output_format == "csv":
+        write_csv(batches, out)
+    else:
+        write_ndjson(batches, out)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate profile summaries for a file of users")
+    parser.add_argument("input", help="CSV/NDJSON file of users, or - for stdin")
+    parser.add_argument("--output", "-o", help="File to write the profiles to (default: stdout)")
+    parser.add_argument("--format", "-f", choices=FORMATS,
+                        help="Input format (default: from the file extension, csv for stdin)")
+    parser.add_argument("--output-format", choices=FORMATS, default="ndjson",
+                        help="Output format (default: ndjson)")
+    parser.add_argument("--year", type=int, help="Compute ages for this year (default: the current year)")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or ("csv" if args.input == "-" else detect_format(args.input))
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.input == "-":
+                # Read stdin like a file: UTF-8 whatever the locale, BOM
+                # skipped, and newlines inside quoted CSV fields kept
+                lines = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+                stack.callback(lines.detach)
+            else:
+                lines = stack.enter_context(open(args.input, encoding="utf-8-sig", newline=""))
+            out = sys.stdout if not args.output else stack.enter_context(
+                open(args.output, "w", encoding="utf-8", newline=""))
+            counts = convert(lines, out, input_format, args.output_format, args.year)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"Error: {e}\n")
+
+    if counts["invalid"]:
+        print(f"Skipped {counts['invalid']} record(s) without a name or a birth year "
+              f"from {MIN_BIRTH_YEAR} to {args.year or date.today().year}.",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the vectorized grade analytics (grade_analytics.GradeBook)
+against the per-student Python loops the analyzer used before.
+
+Generates a random grade book (1M students, 50M grades by default), times
+averages, min/max, percentiles, top-K and the report summary, and times
+the same report computed with Python loops on a sample of students,
+extrapolated to all of them.
+
+Usage:
+    python bench_grade_analytics.py [--students 1000000] [--grades 50000000] [--json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from grade_analytics import GRADE_DTYPE, GradeBook
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized grade analytics")
+    parser.add_argument("--students", type=int, default=1_000_000, help="Number of students")
+    parser.add_argument("--grades", type=int, default=50_000_000, help="Total number of grades")
+    parser.add_argument("--sample", type=int, default=20_000,
+                        help="Students timed with the pure Python loops")
+    parser.add_argument("--top", type=int, default=10, help="K for top-K")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    if args.students < 1 or args.grades < 1:
+        parser.error("--students and --grades must be at least 1")
+    return args
+
+
+def random_grade_book(students, grades, seed):
+    """Random grades with a random number of grades per student"""
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.integers(0, grades + 1, size=students - 1))
+    offsets = np.concatenate(([0], cuts, [grades])).astype(np.int64)
+    values = rng.integers(0, 101, size=grades, dtype=GRADE_DTYPE)
+    return GradeBook([f"Student {i}" for i in range(students)], values, offsets)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def python_report(grade_lists):
+    """What show_report and find_top_performer computed, per student in Python"""
+    averages = [sum(grades) / len(grades) for grades in grade_lists if grades]
+    minimums = [min(grades) for grades in grade_lists if grades]
+    maximums = [max(grades) for grades in grade_lists if grades]
+    top = max((grades for grades in grade_lists if grades), key=lambda grades: sum(grades) / len(grades))
+    return averages, minimums, maximums, top, (max(averages), min(averages), sum(averages) / len(averages))
+
+
+def main():
+    args = parse_args()
+
+    book, build_seconds = timed(lambda: random_grade_book(args.students, args.grades, args.seed))
+
+    averages, averages_seconds = timed(book.averages)
+    timings = {
+        "averages": averages_seconds,
+        "min_max": timed(lambda: (book.minimums(), book.maximums()))[1],
+        "grade_percentiles": timed(lambda: book.grade_percentiles([50, 90, 99]))[1],
+        "average_percentiles": timed(lambda: book.average_percentiles([50, 90, 99], averages))[1],
+        f"top_{args.top}": timed(lambda: book.top_k(args.top, averages))[1],
+        "summary": timed(lambda: book.summary(averages))[1],
+    }
+    # The operations the Python loops below also do (no percentiles)
+    vectorized_total = sum(timings[name] for name in ("averages", "min_max", f"top_{args.top}", "summary"))
+
+    # Pure Python on a sample of students, scaled to the whole grade book
+    sample = min(args.sample, args.students)
+    grade_lists = [
+        book.grades[book.offsets[i]:book.offsets[i + 1]].tolist() for i in range(sample)
+    ]
+    python_seconds = timed(lambda: python_report(grade_lists))[1]
+    sampled_grades = int(book.offsets[sample])
+    python_estimate = python_seconds * len(book.grades) / max(sampled_grades, 1)
+
+    report = {
+        "students": args.students,
+        "grades": args.grades,
+        "build_s": round(build_seconds, 3),
+        "vectorized_s": {name: round(seconds, 4) for name, seconds in timings.items()},
+        "vectorized_report_s": round(vectorized_total, 4),
+        "python_sample_students": sample,
+        "python_estimated_total_s": round(python_estimate, 3),
+        "speedup": round(python_estimate / vectorized_total, 1),
+        "memory_mb": round((book.grades.nbytes + book.offsets.nbytes) / 2**20, 1),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 {args.students:,} students, {args.grades:,} grades ({report['memory_mb']} MB)")
+    for name, seconds in report["vectorized_s"].items():
+        print(f"  {name:<22} {seconds * 1000:>10.1f} ms")
+    print("  report (averages, min/max, top, summary):")
+    print(f"  {'vectorized':<22} {vectorized_total * 1000:>10.1f} ms")
+    print(f"  {'python loops (est.)':<22} {python_estimate * 1000:>10.1f} ms")
+    print(f"  speedup: {report['speedup']}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Columnar, NumPy-backed grade storage and analytics for the grade analyzer.
+
+All grades are kept in one flat array grouped by student, with an offsets
+array marking where each student's grades start (CSR layout): the grades
+of student i are grades[offsets[i]:offsets[i + 1]]. Per-student
+aggregates are computed for all students at once with ufunc.reduceat,
+instead of a Python loop over every grade list.
+
+StudentAverages holds only each student's grade count and average, which
+is all the analyzer's StudentRegistry and SqliteGradeStore keep; the top-K,
+summary and percentiles of the averages are computed on it, and GradeBook
+hands its own averages to it for those.
+"""
+
+import numpy as np
+
+# Grades are integers from 0 to 100
+GRADE_DTYPE = np.uint8
+
+
+class StudentAverages:
+    """
+    Grade count and average of many students, without the grades themselves.
+
+    Args:
+        names (list): Student names, in order
+        counts (array-like): Number of grades of every student
+        averages (array-like): Average grade of every student, NaN without grades
+
+    Raises:
+        ValueError: If counts or averages don't have one value per student
+    """
+
+    def __init__(self, names, counts, averages):
+        self.names = list(names)
+        self._counts = np.asarray(counts, dtype=np.int64)
+        self._averages = np.asarray(averages, dtype=np.float64)
+
+        if len(self._counts) != len(self.names) or len(self._averages) != len(self.names):
+            raise ValueError("counts and averages need one value per student")
+
+    @classmethod
+    def from_students(cls, students):
+        """
+        Read the analyzer's students (a StudentRegistry, or anything yielding
+        records with name, count and average), in registration order.
+        """
+        names, counts, averages = [], [], []
+        for student in students:
+            names.append(student.name)
+            counts.append(student.count)
+            averages.append(np.nan if student.average is None else student.average)
+        return cls(names, counts, averages)
+
+    def __len__(self):
+        return len(self.names)
+
+    def counts(self):
+        """Number of grades of every student"""
+        return self._counts
+
+    def averages(self):
+        """Average grade of every student, NaN without grades"""
+        return self._averages
+
+    def average_percentiles(self, q):
+        """Percentiles (0-100) of the averages of students with grades"""
+        return np.nanpercentile(self._averages, q)
+
+    def top_k(self, k):
+        """
+        Students with the highest averages.
+
+        Returns:
+            numpy.ndarray: Up to k student indices, best average first; ties
+            are kept in student order, students without grades are skipped
+        """
+        averages = self._averages
+        candidates = np.flatnonzero(~np.isnan(averages))
+        k = min(k, len(candidates))
+        if k == 0:
+            return candidates[:0]
+
+        if k < len(candidates):
+            # Keep every student tied with the k-th best, then sort just those
+            kth = np.partition(averages[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[averages[candidates] >= kth]
+
+        order = np.lexsort((candidates, -averages[candidates]))
+        return candidates[order[:k]]
+
+    def summary(self):
+        """
+        Overall statistics of the student averages, as in the analyzer report.
+
+        Returns:
+            dict: max_average, min_average and overall_average (the mean of
+            the student averages), or None if no student has grades
+        """
+        averages = self._averages
+        graded = averages[~np.isnan(averages)]
+        if len(graded) == 0:
+            return None
+
+        return {
+            "max_average": float(graded.max()),
+            "min_average": float(graded.min()),
+            "overall_average": float(graded.mean()),
+        }
+
+
+class GradeBook:
+    """
+    Grades of many students in CSR layout.
+
+    Args:
+        names (list): Student names, in order
+        grades (array-like): All grades, grouped by student
+        offsets (array-like): len(names) + 1 positions into grades, starting
+            at 0 and ending at len(grades)
+
+    Raises:
+        ValueError: If offsets don't match names and grades
+    """
+
+    def __init__(self, names, grades, offsets):
+        self.names = list(names)
+        self.grades = np.asarray(grades, dtype=GRADE_DTYPE)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+        if (len(self.offsets) != len(self.names) + 1 or self.offsets[0] != 0
+                or self.offsets[-1] != len(self.grades) or np.any(np.diff(self.offsets) < 0)):
+            raise ValueError("offsets must rise from 0 to len(grades), one per student plus one")
+
+    def __len__(self):
+        return len(self.names)
+
+    def counts(self):
+        """Number of grades of every student"""
+        return np.diff(self.offsets)
+
+    def _reduce(self, ufunc, dtype):
+        """
+        Apply ufunc to every student's grades.
+
+        Returns:
+            tuple: (values for the students with grades, mask of those students)
+        """
+        has_grades = self.counts() > 0
+        if not has_grades.any():
+            return np.empty(0, dtype=dtype), has_grades
+
+        # Only non-empty segments are reduced: reduceat would return the
+        # next grade for an empty one
+        return ufunc.reduceat(self.grades, self.offsets[:-1][has_grades], dtype=dtype), has_grades
+
+    def _per_student(self, values, has_grades, empty):
+        result = np.full(len(self), empty, dtype=np.result_type(values, type(empty)))
+        result[has_grades] = values
+        return result
+
+    def sums(self):
+        """Sum of every student's grades (0 without grades)"""
+        # Summing in 32 bits is about twice as fast and can't overflow below
+        # 42 million grades per student
+        counts = self.counts()
+        dtype = np.uint32 if len(counts) == 0 or counts.max() * 100 < 2**32 else np.int64
+        return self._per_student(*self._reduce(np.add, dtype), 0).astype(np.int64)
+
+    def averages(self):
+        """Average grade of every student, NaN without grades"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums() / self.counts()
+
+    def minimums(self):
+        """Lowest grade of every student, NaN without grades"""
+        return self._per_student(*self._reduce(np.minimum, GRADE_DTYPE), np.nan)
+
+    def maximums(self):
+        """Highest grade of every student, NaN without grades"""
+        return self._per_student(*self._reduce(np.maximum, GRADE_DTYPE), np.nan)
+
+    def grade_percentiles(self, q):
+        """
+        Percentiles (0-100) of all grades.
+
+        Same result as numpy.percentile (linear interpolation), computed
+        from a histogram of the 101 possible grades instead of sorting.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if len(self.grades) == 0:
+            return np.full(q.shape, np.nan)
+
+        # The k-th smallest grade is the first one whose cumulative count exceeds k
+        cumulative = np.cumsum(np.bincount(self.grades, minlength=101))
+        position = q / 100 * (len(self.grades) - 1)
+        lower = np.floor(position)
+        low_grade = np.searchsorted(cumulative, lower, side="right")
+        high_grade = np.searchsorted(cumulative, np.minimum(lower + 1, len(self.grades) - 1), side="right")
+        return low_grade + (high_grade - low_grade) * (position - lower)
+
+    def student_averages(self, averages=None):
+        """Grade counts and averages of every student, as StudentAverages"""
+        return StudentAverages(self.names, self.counts(), self.averages() if averages is None else averages)
+
+    def average_percentiles(self, q, averages=None):
+        """Percentiles (0-100) of the averages of students with grades"""
+        return self.student_averages(averages).average_percentiles(q)
+
+    def top_k(self, k, averages=None):
+        """Students with the highest averages, see StudentAverages.top_k"""
+        return self.student_averages(averages).top_k(k)
+
+    def summary(self, averages=None):
+        """Overall statistics of the student averages, see StudentAverages.summary"""
+        return self.student_averages(averages).summary()
@@ -0,0 +1,332 @@
+"""
+Batch ingestion of students and grades from CSV or NDJSON.
+
+Records flow through a generator pipeline (lines -> records -> per-student
+aggregates), so memory grows with the number of students, not grades.
+
+Input formats, one record per line:
+    csv     header with "name" and "grade" columns, e.g. `Alice,90`;
+            an empty grade registers the student without a grade
+    ndjson  {"name": "Alice", "grade": 90} or {"name": "Alice", "grades": [90, 85]}
+
+Grades are validated like in the interactive mode: integers from 0 to 100.
+With several workers a file is split into byte ranges on line boundaries,
+each range is aggregated in its own process and the partial aggregates
+are merged in file order, so students keep the order of first appearance.
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from student_registry import StudentRegistry
+
+FORMATS = ("csv", "ndjson")
+
+EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+MIN_GRADE = 0
+MAX_GRADE = 100
+
+# Ranges smaller than this aren't worth a process of their own
+MIN_CHUNK_BYTES = 1 << 20
+
+# Bytes read and decoded at once
+BLOCK_SIZE = 1 << 20
+
+
+def detect_format(path, default="csv"):
+    """Input format from the file extension"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def parse_grade(value, minimum=MIN_GRADE, maximum=MAX_GRADE):
+    """
+    Validate a grade with the same rule as add_grades_for_student.
+
+    Returns:
+        int: The grade, or None if it isn't an integer from minimum to maximum
+    """
+    # Exact type checks: JSON true/false and floats are not grades
+    if type(value) is str:
+        try:
+            value = int(value)
+        except ValueError:
+            return None
+    elif type(value) is not int:
+        return None
+
+    return value if minimum <= value <= maximum else None
+
+
+def iter_lines(path, start=0, end=None, block_size=BLOCK_SIZE):
+    """
+    Yield the decoded lines starting inside the byte range [start, end).
+
+    A line belongs to the range containing its first byte, so consecutive
+    ranges split a file without losing or repeating lines. The file is read
+    and decoded in blocks cut at the last newline, which can't fall inside
+    a multi-byte UTF-8 character.
+    """
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # finish the line the previous range started
+
+        remaining = None if end is None else end - f.tell()
+        pending = b""
+        first = start == 0
+
+        while True:
+            size = block_size if remaining is None else min(block_size, remaining)
+            block = f.read(size) if size > 0 else b""
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+
+            block = pending + block
+            cut = block.rfind(b"\n") + 1
+            pending = block[cut:]
+            if cut:
+                text = block[:cut - 1].decode("utf-8")
+                if first:
+                    text = text.removeprefix("\ufeff")
+                    first = False
+                yield from text.split("\n")
+
+        # A line starting inside the range may end after it
+        if pending and end is not None:
+            pending += f.readline()
+        if pending:
+            text = pending.decode("utf-8")
+            yield (text.removeprefix("\ufeff") if first else text).rstrip("\n")
+
+
+def csv_columns(header):
+    """
+    Positions of the name and grade columns in a CSV header row.
+
+    Raises:
+        ValueError: If a column is missing
+    """
+    columns = [column.strip().lower() for column in header]
+    try:
+        return columns.index("name"), columns.index("grade")
+    except ValueError:
+        raise ValueError("CSV input needs a header with 'name' and 'grade' columns")
+
+
+def parse_csv(lines, columns):
+    """Yield (name, grade value) pairs from CSV lines (without the header)"""
+    name_column, grade_column = columns
+    width = max(columns) + 1
+
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        yield row[name_column], row[grade_column]
+
+
+def parse_ndjson(lines):
+    """Yield (name, grade value) pairs from NDJSON lines"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None, None
+            continue
+        if not isinstance(record, dict):
+            yield None, None
+            continue
+
+        name = record.get("name")
+        if "grades" in record:
+            grades = record["grades"] if isinstance(record["grades"], list) else [record["grades"]]
+            if not grades:
+                yield name, ""
+            for grade in grades:
+                yield name, grade
+        else:
+            yield name, record.get("grade", "")
+
+
+def aggregate(records):
+    """
+    Fold (name, grade value) pairs into per-student aggregates.
+
+    Returns:
+        tuple: (list of [name, total, count, min, max] in order of first
+        appearance, number of invalid records)
+    """
+    students = {}
+    by_raw_name = {}  # skips normalizing names seen before
+    invalid = 0
+
+    for name, value in records:
+        student = by_raw_name.get(name)
+        if student is None:
+            if not isinstance(name, str) or not name.strip():
+                invalid += 1
+                continue
+
+            key = name.strip().casefold()
+            student = students.get(key)
+            if student is None:
+                student = students[key] = [name.strip(), 0, 0, None, None]
+            by_raw_name[name] = student
+
+        # An empty grade only registers the student
+        if value is None or value == "":
+            continue
+
+        grade = parse_grade(value)
+        if grade is None:
+            invalid += 1
+            continue
+
+        student[1] += grade
+        student[2] += 1
+        if student[3] is None or grade < student[3]:
+            student[3] = grade
+        if student[4] is None or grade > student[4]:
+            student[4] = grade
+
+    return list(students.values()), invalid
+
+
+def _records(lines, input_format, columns=None):
+    if input_format == "csv":
+        return parse_csv(lines, columns)
+    return parse_ndjson(lines)
+
+
+def ingest_range(path, start, end, input_format, columns=None):
+    """Aggregate the records of one byte range of a file (runs in a worker process)"""
+    return aggregate(_records(iter_lines(path, start, end), input_format, columns))
+
+
+def byte_ranges(start, size, workers):
+    """Split [start, size) into at most `workers` ranges of about MIN_CHUNK_BYTES or more"""
+    count = max(1, min(workers, (size - start) // MIN_CHUNK_BYTES))
+    step = (size - start) // count + 1
+    return [(offset, min(offset + step, size)) for offset in range(start, size, step)]
+
+
+def _open(source, input_format):
+    """
+    Lines of a file or text stream, after the CSV header.
+
+    Returns:
+        tuple: (line iterator, CSV name/grade columns or None, byte length
+        of the header)
+    """
+    if input_format not in FORMATS:
+        raise ValueError(f"Unknown format '{input_format}', expected one of {', '.join(FORMATS)}")
+
+    if isinstance(source, str):
+        lines = iter_lines(source)
+    else:
+        lines = iter(source)
+
+    columns = None
+    data_start = 0
+    if input_format == "csv":
+        header = next(lines, "")
+        columns = csv_columns(next(csv.reader([header]), []))
+        data_start = len(header.encode("utf-8"))
+
+    return lines, columns, data_start
+
+
+def ingest(source, input_format="csv", workers=1):
+    """
+    Read students and grades into a registry.
+
+    Args:
+        source (str or file): Path of a CSV/NDJSON file, or a text stream
+            such as sys.stdin (always read by a single process)
+        input_format (str): "csv" or "ndjson"
+        workers (int): Processes parsing byte ranges of a file in parallel
+
+    Returns:
+        tuple: (StudentRegistry, number of invalid records)
+
+    Raises:
+        ValueError: If the CSV header lacks the name or grade column
+    """
+    lines, columns, data_start = _open(source, input_format)
+
+    ranges = []
+    if isinstance(source, str) and workers > 1:
+        ranges = byte_ranges(data_start, os.path.getsize(source), workers)
+
+    if len(ranges) > 1:
+        lines.close()
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(ingest_range, source, start, end, input_format, columns)
+                for start, end in ranges
+            ]
+            partials = [future.result() for future in futures]
+    else:
+        partials = [aggregate(_records(lines, input_format, columns))]
+
+    registry = StudentRegistry()
+    invalid = 0
+    for students, partial_invalid in partials:
+        invalid += partial_invalid
+        for name, total, count, minimum, maximum in students:
+            registry.merge(name, total, count, minimum, maximum)
+
+    return registry, invalid
+
+
+def load(source, input_format, students):
+    """
+    Add students and grades one record at a time to a store that keeps every
+    grade, such as grade_store.SqliteGradeStore (single process).
+
+    Grades must be within the store's MIN_GRADE and MAX_GRADE.
+
+    Returns:
+        int: Number of invalid records
+
+    Raises:
+        ValueError: If the CSV header lacks the name or grade column
+    """
+    lines, columns, _ = _open(source, input_format)
+    known = {}  # records by name, saves a lookup per grade
+    invalid = 0
+
+    for name, value in _records(lines, input_format, columns):
+        if not isinstance(name, str) or not name.strip():
+            invalid += 1
+            continue
+
+        name = name.strip()
+        record = known.get(name)
+        if record is None:
+            record = known[name] = students.get(name) or students.add(name)
+
+        # An empty grade only registers the student
+        if value is None or value == "":
+            continue
+
+        grade = parse_grade(value, students.MIN_GRADE, students.MAX_GRADE)
+        if grade is None:
+            invalid += 1
+            continue
+
+        students.add_grade(record, grade)
+
+    return invalid
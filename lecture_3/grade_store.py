@@ -0,0 +1,213 @@
+"""
+SQLite storage for the grade analyzer, using the lecture_4 schema.
+
+SqliteGradeStore has the same interface as StudentRegistry, so the
+analyzer's menu and report work on either. Students and grades are kept
+in the `students` and `grades` tables of lecture_4/scripts.sql (its
+tables, indexes and triggers are created, not its sample data);
+new grades are buffered and written in batches inside one transaction,
+and the report and top performer are computed with AVG ... GROUP BY in
+SQLite, so the data doesn't have to fit in memory: the report streams
+the per-student rows from the cursor, and its max, min and overall
+average come from one aggregate query over them.
+
+The analyzer only knows names and grades, so new students get the
+placeholder birth year UNKNOWN_BIRTH_YEAR and grades the subject
+DEFAULT_SUBJECT. Unlike the lecture_4 report queries, repeated grades of
+a student are all counted, as in the in-memory registry.
+"""
+
+import os
+import sqlite3
+from collections import namedtuple
+
+SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "lecture_4", "scripts.sql"
+)
+
+# Comment starting the sample data section of scripts.sql
+SAMPLE_DATA_MARKER = "-- Insert Sample Data"
+
+# students.birth_year is NOT NULL and at least 1900
+UNKNOWN_BIRTH_YEAR = 1900
+DEFAULT_SUBJECT = "General"
+
+# Grade rows written per transaction
+BATCH_SIZE = 1000
+
+# One student with the aggregates of its grades (average is None without grades)
+StoredStudent = namedtuple("StoredStudent", ["id", "name", "count", "average"])
+
+_STUDENTS_QUERY = """
+    SELECT s.id, s.full_name, COUNT(g.grade), AVG(g.grade)
+    FROM students s
+    LEFT JOIN grades g ON g.student_id = s.id
+"""
+
+
+def schema_statements(path=SCHEMA_PATH):
+    """
+    Schema statements of a SQL script: everything before its sample data
+    (SAMPLE_DATA_MARKER) and queries.
+
+    Yields:
+        str: One complete statement at a time
+    """
+    statement = ""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not statement and line.strip() == SAMPLE_DATA_MARKER:
+                return
+            if not statement and (not line.strip() or line.lstrip().startswith("--")):
+                continue
+            statement += line
+            if sqlite3.complete_statement(statement):
+                yield statement.strip()
+                statement = ""
+
+
+class SqliteGradeStore:
+    """
+    Students and grades persisted in a SQLite database.
+
+    Names are matched case-insensitively with SQLite's NOCASE collation
+    (ASCII letters only). Use as a context manager, or call close(), to
+    write the last batch.
+
+    Args:
+        path (str): Database file, created with the schema if needed
+        batch_size (int): Grades buffered before they are written
+    """
+
+    # The grades table accepts 1 to 100
+    MIN_GRADE = 1
+    MAX_GRADE = 100
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+
+        with self._conn:
+            for statement in schema_statements():
+                self._conn.execute(statement)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_students_full_name_nocase "
+                "ON students(full_name COLLATE NOCASE)"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Write buffered grades, commit and close the database"""
+        if self._conn is None:
+            return
+        self.commit()
+        self._conn.close()
+        self._conn = None
+
+    def flush(self):
+        """Insert buffered grades into the current transaction"""
+        if self._pending:
+            self._conn.executemany(
+                "INSERT INTO grades (student_id, subject, grade) VALUES (?, ?, ?)",
+                self._pending,
+            )
+            self._pending.clear()
+
+    def commit(self):
+        """Write buffered grades and commit"""
+        self.flush()
+        self._conn.commit()
+
+    def _query(self, sql, parameters=()):
+        self.flush()  # reads must see every added grade
+        return self._conn.execute(sql, parameters)
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def __bool__(self):
+        return self._query("SELECT EXISTS (SELECT 1 FROM students)").fetchone()[0] == 1
+
+    def __iter__(self):
+        """Students in registration order, with their averages computed by SQLite"""
+        rows = self._query(_STUDENTS_QUERY + " GROUP BY s.id ORDER BY s.id")
+        return (StoredStudent(*row) for row in rows)
+
+    def __contains__(self, name):
+        return self._find_id(name) is not None
+
+    def _find_id(self, name):
+        row = self._query(
+            "SELECT id FROM students WHERE full_name = ? COLLATE NOCASE ORDER BY id LIMIT 1",
+            (name,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def get(self, name):
+        """Find a student by name, ignoring case, or return None"""
+        student_id = self._find_id(name)
+        if student_id is None:
+            return None
+        row = self._query(_STUDENTS_QUERY + " WHERE s.id = ? GROUP BY s.id", (student_id,)).fetchone()
+        return StoredStudent(*row)
+
+    def add(self, name, birth_year=UNKNOWN_BIRTH_YEAR):
+        """
+        Register a new student.
+
+        Raises:
+            ValueError: If a student with the same name (ignoring case) exists
+        """
+        if name in self:
+            raise ValueError(f"A student named '{name}' already exists.")
+
+        cursor = self._conn.execute(
+            "INSERT INTO students (full_name, birth_year) VALUES (?, ?)", (name, birth_year)
+        )
+        return StoredStudent(cursor.lastrowid, name, 0, None)
+
+    def add_grade(self, record, grade, subject=DEFAULT_SUBJECT):
+        """Buffer a grade of a registered student, committing every batch_size grades"""
+        self._pending.append((record.id, subject, grade))
+        if len(self._pending) >= self.batch_size:
+            self.commit()
+
+    def has_grades(self):
+        """True if at least one student has a grade"""
+        return self._query("SELECT EXISTS (SELECT 1 FROM grades)").fetchone()[0] == 1
+
+    def summary(self):
+        """
+        Max, min and overall average of the student averages, computed in
+        SQLite over the per-student AVG ... GROUP BY.
+
+        Returns:
+            dict or None: Same keys as StudentAverages.summary, None
+                without grades
+        """
+        row = self._query(
+            "SELECT MAX(average), MIN(average), AVG(average)"
+            " FROM (SELECT AVG(grade) AS average FROM grades GROUP BY student_id)"
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return {"max_average": row[0], "min_average": row[1], "overall_average": row[2]}
+
+    def top(self):
+        """Student with the highest average (the first registered on ties), or None"""
+        row = self._query(
+            _STUDENTS_QUERY + " WHERE g.grade IS NOT NULL"
+            " GROUP BY s.id ORDER BY AVG(g.grade) DESC, s.id LIMIT 1"
+        ).fetchone()
+        return StoredStudent(*row) if row else None
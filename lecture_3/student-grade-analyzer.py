@@ -1,7 +1,21 @@
-def main():
+import argparse
+import contextlib
+import io
+import sqlite3
+import sys
+
+import grade_ingest
+import grade_store
+from student_registry import StudentRegistry
+
+def main(students=None):
     """
     Main function that runs the Student Grade Management System.
     
+    Args:
+        students (StudentRegistry or SqliteGradeStore): Where students are
+            kept, a new in-memory registry by default
+    
     This program provides a menu-driven interface to manage student data including:
     - Adding new students
     - Adding grades for students
@@ -11,7 +25,8 @@ def main():
     The program runs in an infinite loop until the user chooses to exit.
     """
     
-    students = []  # List of student dictionaries
+    if students is None:
+        students = StudentRegistry()  # Students by case-insensitive name
     
     while True:
         # Display menu
@@ -65,26 +80,19 @@ def add_new_student(students):
         return
     
     # Check if student already exists
-    for student in students:
-        if student["name"].lower() == name.lower():
-            print(f"Error: A student named '{name}' already exists.")
-            return
-    
-    # Create new student dictionary
-    new_student = {
-        "name": name,
-        "grades": []
-    }
-    
-    # Add to students list
-    students.append(new_student)
+    if name in students:
+        print(f"Error: A student named '{name}' already exists.")
+        return
+    
+    # Add to the registry
+    students.add(name)
 
 def add_grades_for_student(students):
     """
     Add grades for an existing student.
     
     Args:
-        students (list): List of student dictionaries to search and modify
+        students (StudentRegistry): Registered students to search and modify
         
     Process:
         - Validates that students exist in system
@@ -103,11 +111,7 @@ def add_grades_for_student(students):
     name = input("Enter student name: ").strip()
     
     # Find the student
-    student_found = None
-    for student in students:
-        if student["name"].lower() == name.lower():
-            student_found = student
-            break
+    student_found = students.get(name)
     
     if not student_found:
         print(f"Error: Student '{name}' not found.")
@@ -126,10 +130,10 @@ def add_grades_for_student(students):
         try:
             grade = int(grade_input)
             
-            if 0 <= grade <= 100:
-                student_found["grades"].append(grade)
+            if students.MIN_GRADE <= grade <= students.MAX_GRADE:
+                students.add_grade(student_found, grade)
             else:
-                print("Error: Grade must be between 0 and 100.")
+                print(f"Error: Grade must be between {students.MIN_GRADE} and {students.MAX_GRADE}.")
                 
         except ValueError:
             print("Invalid input. Please enter a number.")
@@ -139,13 +143,16 @@ def show_report(students):
     Generate and display a comprehensive report of all students.
     
     Args:
-        students (list): List of student dictionaries to analyze
+        students (StudentRegistry or SqliteGradeStore): Registered students
+            to analyze
         
     Process:
         - Checks if students and grades exist
-        - Calculates individual student averages
+        - Prints each student's average as the students are iterated, so a
+          SqliteGradeStore streams them from its cursor
         - Handles students with no grades (N/A)
-        - Displays overall statistics (max, min, overall average)
+        - Displays overall statistics (max, min, overall average) from the
+          students' summary()
     """
     print("--- Student Report ---")
     
@@ -155,35 +162,23 @@ def show_report(students):
         return
     
     # Check if any student has grades
-    has_grades = any(student["grades"] for student in students)
-    if not has_grades:
+    if not students.has_grades():
         print("No grades available for any student.")
         return
     
-    averages = []
-    
-    # Iterate through students and calculate averages
     for student in students:
-        name = student["name"]
-        grades = student["grades"]
-        
-        try:
-            if grades:  # If student has grades
-                average = sum(grades) / len(grades)
-                averages.append(average)
-                print(f"{name}'s average grade is {average:.1f}.")
-            else:  # Student has no grades
-                print(f"{name}'s average grade is N/A.")
-                
-        except ZeroDivisionError:
-            print(f"{name}'s average grade is N/A.")
+        if student.average is None:  # Student has no grades
+            print(f"{student.name}'s average grade is N/A.")
+        else:
+            print(f"{student.name}'s average grade is {student.average:.1f}.")
     
     # Print overall summary
-    if averages:  # Only print summary if we have calculated averages
+    summary = students.summary()
+    if summary:  # Only print summary if we have calculated averages
         print("----------------------")
-        print(f"Max Average: {max(averages):.1f}")
-        print(f"Min Average: {min(averages):.1f}")
-        print(f"Overall Average: {sum(averages) / len(averages):.1f}")
+        print(f"Max Average: {summary['max_average']:.1f}")
+        print(f"Min Average: {summary['min_average']:.1f}")
+        print(f"Overall Average: {summary['overall_average']:.1f}")
 
 # Placeholder function for remaining menu option
 def find_top_performer(students):
@@ -191,11 +186,10 @@ def find_top_performer(students):
     Find and display the student with the highest average grade.
     
     Args:
-        students (list): List of student dictionaries to analyze
+        students (StudentRegistry): Registered students to analyze
         
     Process:
-        - Filters out students with no grades
-        - Uses lambda function with max() to find top performer
+        - Reads the top performer kept up to date by the registry's heap
         - Handles cases with no students or no grades
         - Displays top student name and average grade
     """
@@ -205,27 +199,89 @@ def find_top_performer(students):
         print("No students available.")
         return
     
-    # Filter out students with no grades
-    students_with_grades = [student for student in students if student["grades"]]
+    # Top performer, None if no student has grades
+    top_student = students.top()
     
     # Check if any student has grades
-    if not students_with_grades:
+    if top_student is None:
         print("No students with grades available.")
         return
     
-    # Find top performer using max() with lambda function
-    try:
-        top_student = max(students_with_grades, 
-                         key=lambda student: sum(student["grades"]) / len(student["grades"]))
-        
-        # Calculate the average grade for the top student
-        top_average = sum(top_student["grades"]) / len(top_student["grades"])
-        
-        print(f"The student with the highest average is {top_student['name']} with a grade of {top_average:.1f}.")
+    print(f"The student with the highest average is {top_student.name} with a grade of {top_student.average:.1f}.")
+
+def run(argv):
+    """
+    Run the analyzer from the command line: the interactive menu, or, with
+    --input, read students and grades from a file or stdin and print the
+    report.
+    
+    Args:
+        argv (list): Command line arguments, see --help
+    """
+    parser = argparse.ArgumentParser(
+        description="Manage student grades interactively, or print the grade report "
+                    "for students and grades read from CSV or NDJSON."
+    )
+    parser.add_argument("--input", "-i",
+                        help="CSV/NDJSON file with one grade per line, or - for stdin")
+    parser.add_argument("--format", "-f", choices=grade_ingest.FORMATS,
+                        help="Input format (default: from the file extension, csv for stdin)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Processes parsing a large file in parallel (default: 1, "
+                             "in-memory only)")
+    parser.add_argument("--db",
+                        help="SQLite database to keep students and grades in (lecture_4 schema) "
+                             "instead of memory")
+    args = parser.parse_args(argv)
+    
+    with contextlib.ExitStack() as stack:
+        if args.db:
+            try:
+                students = stack.enter_context(grade_store.SqliteGradeStore(args.db))
+            except (OSError, sqlite3.Error) as e:
+                parser.exit(1, f"Error: cannot open database '{args.db}': {e}\n")
+        else:
+            students = None
         
-    except (ValueError, ZeroDivisionError) as e:
-        print("Error: Unable to determine top performer due to invalid data.")
+        if args.input is None:
+            main(students)
+        else:
+            run_batch(parser, args, students)
+
+def run_batch(parser, args, students=None):
+    """
+    Non-interactive mode: read students and grades from a file or stdin
+    and print the report.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser used to report errors
+        args (argparse.Namespace): Parsed command line arguments
+        students (SqliteGradeStore): Store to add the grades to, None to
+            aggregate them in memory
+    """
+    if args.input == "-":
+        # Read stdin like the input files: UTF-8 with an optional BOM
+        # (Excel's CSV export), so the header still matches
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        input_format = args.format or "csv"
+    else:
+        source = args.input
+        input_format = args.format or grade_ingest.detect_format(args.input)
+    
+    try:
+        if students is None:
+            students, invalid = grade_ingest.ingest(source, input_format, workers=max(1, args.workers))
+        else:
+            invalid = grade_ingest.load(source, input_format, students)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"Error: {e}\n")
+    
+    if invalid:
+        print(f"Skipped {invalid} invalid record(s): grades must be integers between "
+              f"{students.MIN_GRADE} and {students.MAX_GRADE}.", file=sys.stderr)
+    
+    show_report(students)
 
-# Run the program
+# Run the program: interactive menu, or batch mode with --input
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run(sys.argv[1:])
\ No newline at end of file
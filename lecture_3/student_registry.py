@@ -0,0 +1,157 @@
+"""
+Student registry for the grade analyzer.
+
+Students are indexed by case-folded name, so duplicate checks and lookups
+are O(1). Each student is a compact record with the running sum, count,
+minimum and maximum of its grades, updated as grades are added, so
+averages never re-scan a grade list. The top performer is kept in a heap
+with lazy invalidation: every new grade pushes the student's new average,
+and outdated entries are dropped when they reach the top.
+"""
+
+import heapq
+
+from grade_analytics import StudentAverages
+
+
+class StudentRecord:
+    """
+    One student with running aggregates of its grades.
+
+    Attributes:
+        name (str): Name as first entered
+        total (int): Sum of the grades
+        count (int): Number of grades
+        minimum (int): Lowest grade, None without grades
+        maximum (int): Highest grade, None without grades
+    """
+
+    __slots__ = ("name", "total", "count", "minimum", "maximum", "order", "version")
+
+    def __init__(self, name, order):
+        self.name = name
+        self.total = 0
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.order = order  # registration order, breaks ties between averages
+        self.version = 0  # bumped on every grade, outdates older heap entries
+
+    @property
+    def average(self):
+        """Average grade, None without grades"""
+        return self.total / self.count if self.count else None
+
+    def add_grade(self, grade):
+        self.total += grade
+        self.count += 1
+        self.minimum = grade if self.minimum is None else min(self.minimum, grade)
+        self.maximum = grade if self.maximum is None else max(self.maximum, grade)
+        self.version += 1
+
+    def merge(self, total, count, minimum, maximum):
+        """Add the aggregates of several grades at once (e.g. from a file chunk)"""
+        if not count:
+            return
+        self.total += total
+        self.count += count
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+        self.version += 1
+
+    def __repr__(self):
+        return f"<StudentRecord(name='{self.name}', count={self.count}, average={self.average})>"
+
+
+class StudentRegistry:
+    """Students by case-insensitive name, in registration order, with the top performer"""
+
+    # Grades accepted by the analyzer
+    MIN_GRADE = 0
+    MAX_GRADE = 100
+
+    def __init__(self):
+        self._records = {}
+        self._heap = []
+        self._graded = 0
+
+    @staticmethod
+    def _key(name):
+        return name.casefold()
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __contains__(self, name):
+        return self._key(name) in self._records
+
+    def get(self, name):
+        """Find a student by name, ignoring case, or return None"""
+        return self._records.get(self._key(name))
+
+    def add(self, name):
+        """
+        Register a new student.
+
+        Raises:
+            ValueError: If a student with the same name (ignoring case) exists
+        """
+        key = self._key(name)
+        if key in self._records:
+            raise ValueError(f"A student named '{name}' already exists.")
+
+        record = self._records[key] = StudentRecord(name, len(self._records))
+        return record
+
+    def add_grade(self, record, grade):
+        """Add a grade to a registered student and update the top performer"""
+        if record.count == 0:
+            self._graded += 1
+        record.add_grade(grade)
+        self._push(record)
+
+    def merge(self, name, total, count, minimum, maximum):
+        """
+        Add partial aggregates of a student's grades, registering it if needed.
+
+        Returns:
+            StudentRecord: The student
+        """
+        record = self.get(name) or self.add(name)
+        if not count:
+            return record
+
+        if record.count == 0:
+            self._graded += 1
+        record.merge(total, count, minimum, maximum)
+        self._push(record)
+        return record
+
+    def _push(self, record):
+        heapq.heappush(self._heap, (-record.average, record.order, record.version, record))
+
+        # Outdated entries pile up with every grade, rebuild once they dominate
+        if len(self._heap) > 2 * self._graded + 64:
+            self._heap = [
+                (-current.average, current.order, current.version, current)
+                for current in self._records.values() if current.count
+            ]
+            heapq.heapify(self._heap)
+
+    def has_grades(self):
+        """True if at least one student has a grade"""
+        return self._graded > 0
+
+    def summary(self):
+        """Max, min and overall average of the student averages, or None without grades"""
+        return StudentAverages.from_students(self).summary()
+
+    def top(self):
+        """Student with the highest average (the first registered on ties), or None"""
+        heap = self._heap
+        while heap and heap[0][2] != heap[0][3].version:
+            heapq.heappop(heap)
+        return heap[0][3] if heap else None
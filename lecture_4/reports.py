@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Report runner for the school database.
+
+Runs the report queries of scripts.sql against school.db, or against a
+synthetic database (1M students and 20M grades by default), streams each
+result and records its timings. The EXPLAIN QUERY PLAN of every report is
+snapshotted, and --check fails if a report scans the grades table, so a
+schema change that turns an indexed lookup into a full scan is caught
+in CI.
+
+Reports are the statements under "-- Queries" in scripts.sql, named after
+the comment above each one, e.g. top_3_students_with_the_highest_average_grades.
+sqlite3 prepares each statement once and reuses it, so the first run of a
+report (prepare + execute) is reported apart from the best of the repeats.
+
+Usage:
+    python reports.py                                   # school.db
+    python reports.py --synthetic                       # 1M students, 20M grades
+    python reports.py --synthetic --students 10000 --grades 200000 --plans plans.json --check
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_PATH = os.path.join(HERE, "scripts.sql")
+DEFAULT_DB = os.path.join(HERE, "school.db")
+
+# Section comments of scripts.sql
+TABLES_SECTION = "-- Create tables"
+INDEXES_SECTION = "-- Indexes"
+SAMPLE_DATA_SECTION = "-- Insert Sample Data"
+QUERIES_SECTION = "-- Queries"
+
+SUBJECTS = ("Math", "English", "Science", "History", "Art", "Physical Education")
+
+# Rows fetched from a cursor at a time
+FETCH_SIZE = 1000
+
+# Plan lines like "SCAN grades" or "SCAN g USING COVERING INDEX ..."
+SCAN_PATTERN = re.compile(r"^\s*SCAN (\w+)")
+
+# Words that can follow a table name without being its alias
+_NOT_ALIASES = {
+    "where", "on", "join", "left", "inner", "cross", "natural", "group", "order",
+    "limit", "union", "except", "intersect", "using", "set", "values", "as",
+}
+
+
+def split_statements(text):
+    """
+    Split SQL into statements.
+
+    Yields:
+        tuple: (text of the last comment before the statement, statement)
+    """
+    title = ""
+    statement = ""
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if not statement:
+            if stripped.startswith("--"):
+                title = stripped[2:].strip()
+                continue
+            if not stripped:
+                continue
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield title, statement.strip()
+            title = ""
+            statement = ""
+
+
+def report_name(title):
+    """Report name from its comment, e.g. 'Top 3 students ...' -> 'top_3_students_...'"""
+    return re.sub(r"\W+", "_", title.lower()).strip("_")
+
+
+def load_script(path=SCRIPT_PATH):
+    """
+    Split scripts.sql into its sections.
+
+    Returns:
+        dict: "tables" and "schema" (indexes, aggregate tables, triggers)
+        as lists of statements, and "reports" as (name, sql) pairs
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    indexes = text.index(INDEXES_SECTION)
+    sample_data = text.index(SAMPLE_DATA_SECTION)
+    queries = text.index(QUERIES_SECTION)
+
+    return {
+        "tables": [sql for _, sql in split_statements(text[:indexes])],
+        "schema": [sql for _, sql in split_statements(text[indexes:sample_data])],
+        "reports": [
+            (report_name(title), sql) for title, sql in split_statements(text[queries:])
+        ],
+    }
+
+
+def has_schema(conn):
+    """True if the database has the aggregate tables the reports read"""
+    return conn.execute(
+        "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'student_grade_stats')"
+    ).fetchone()[0] == 1
+
+
+def apply_schema(conn, script):
+    """Bring a database up to the scripts.sql schema (idempotent)"""
+    with conn:
+        for statement in script["tables"] + script["schema"]:
+            conn.execute(statement)
+
+
+def generate(path, script, students, grades):
+    """
+    Create a database with synthetic students and random grades.
+
+    Grades are bulk-loaded before the indexes and triggers exist; the
+    aggregate tables are then filled by the schema's backfill.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    subject = "CASE abs(random() % {}) {} END".format(
+        len(SUBJECTS),
+        " ".join(f"WHEN {i} THEN '{name}'" for i, name in enumerate(SUBJECTS)),
+    )
+
+    with conn:
+        for statement in script["tables"]:
+            conn.execute(statement)
+
+        # Student 1 is the one the "specific student" report looks up
+        conn.execute(
+            """
+            INSERT INTO students (id, full_name, birth_year)
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+            SELECT n, CASE n WHEN 1 THEN 'Alice Johnson' ELSE 'Student ' || n END,
+                1995 + abs(random() % 15)
+            FROM seq
+            """,
+            (students,),
+        )
+        conn.execute(
+            f"""
+            INSERT INTO grades (student_id, subject, grade)
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+            SELECT 1 + abs(random() % ?), {subject}, 1 + abs(random() % 100)
+            FROM seq
+            """,
+            (grades, students),
+        )
+
+    apply_schema(conn, script)
+    return conn
+
+
+def query_plan(conn, sql):
+    """EXPLAIN QUERY PLAN lines, indented by depth"""
+    depths = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in conn.execute("EXPLAIN QUERY PLAN " + sql):
+        depths[node_id] = depths.get(parent, -1) + 1
+        lines.append("  " * depths[node_id] + detail)
+    return lines
+
+
+def table_aliases(sql, table):
+    """Names a table goes by in a query: its own and its aliases"""
+    aliases = {table.lower()}
+    for alias in re.findall(rf"\b{table}\s+(?:AS\s+)?(\w+)", sql, re.IGNORECASE):
+        if alias.lower() not in _NOT_ALIASES:
+            aliases.add(alias.lower())
+    return aliases
+
+
+def full_scans(plan, sql, table="grades"):
+    """Plan lines that scan the whole table (with or without a covering index)"""
+    aliases = table_aliases(sql, table)
+    return [
+        line for line in plan
+        if (match := SCAN_PATTERN.match(line)) and match.group(1).lower() in aliases
+    ]
+
+
+def run_report(conn, sql, repeat):
+    """
+    Run a report repeat times, streaming the rows.
+
+    Returns:
+        tuple: (number of rows, seconds per run)
+    """
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor = conn.execute(sql)
+        rows = 0
+        while batch := cursor.fetchmany(FETCH_SIZE):
+            rows += len(batch)
+        timings.append(time.perf_counter() - start)
+    return rows, timings
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the school.db reports and check their query plans")
+    parser.add_argument("--db", help=f"SQLite database (default: {os.path.basename(DEFAULT_DB)}, "
+                        "or a temporary file with --synthetic)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Generate a database with random data instead of using an existing one")
+    parser.add_argument("--students", type=int, default=1_000_000, help="Synthetic students")
+    parser.add_argument("--grades", type=int, default=20_000_000, help="Synthetic grades")
+    parser.add_argument("--upgrade", action="store_true",
+                        help="Apply the scripts.sql schema (indexes, aggregate tables, triggers) "
+                        "to an existing database that lacks it")
+    parser.add_argument("--reports", help="Comma-separated report names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per report")
+    parser.add_argument("--plans-only", action="store_true", help="Only snapshot the query plans")
+    parser.add_argument("--plans", help="Write the query plan snapshot to this JSON file")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if a report scans the grades table")
+    args = parser.parse_args()
+    if args.students < 1 or args.grades < 0:
+        parser.error("--students must be at least 1 and --grades at least 0")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return parser, args
+
+
+def open_database(parser, args, script, tmpdir):
+    if args.synthetic:
+        path = args.db or os.path.join(tmpdir, "school.db")
+        if os.path.exists(path):
+            parser.error(f"{path} already exists, --synthetic needs a new file")
+        start = time.perf_counter()
+        conn = generate(path, script, args.students, args.grades)
+        print(f"Generated {args.students:,} students and {args.grades:,} grades "
+              f"in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        return conn
+
+    path = args.db or DEFAULT_DB
+    if not os.path.exists(path):
+        parser.error(f"{path} not found")
+    conn = sqlite3.connect(path)
+    if args.upgrade:
+        apply_schema(conn, script)
+    elif not has_schema(conn):
+        parser.error(f"{path} predates the aggregate tables in scripts.sql, run with --upgrade")
+    return conn
+
+
+def main():
+    parser, args = parse_args()
+    script = load_script()
+
+    reports = script["reports"]
+    if args.reports:
+        names = args.reports.split(",")
+        unknown = set(names) - {name for name, _ in reports}
+        if unknown:
+            parser.error(f"Unknown reports: {', '.join(sorted(unknown))} "
+                         f"(available: {', '.join(name for name, _ in reports)})")
+        reports = [(name, sql) for name, sql in reports if name in names]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = open_database(parser, args, script, tmpdir)
+        try:
+            results = {}
+            for name, sql in reports:
+                plan = query_plan(conn, sql)
+                result = {"sql": sql, "plan": plan, "full_scans": full_scans(plan, sql)}
+                if not args.plans_only:
+                    rows, timings = run_report(conn, sql, args.repeat)
+                    result.update(
+                        rows=rows,
+                        first_ms=round(timings[0] * 1000, 3),
+                        best_ms=round(min(timings) * 1000, 3),
+                    )
+                results[name] = result
+        finally:
+            conn.close()
+
+    if args.plans:
+        snapshot = {name: {"sql": result["sql"], "plan": result["plan"]} for name, result in results.items()}
+        with open(args.plans, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+            f.write("\n")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            timing = "" if args.plans_only else (
+                f"{result['rows']:>9,} rows  first {result['first_ms']:>10.1f} ms  "
+                f"best {result['best_ms']:>10.1f} ms"
+            )
+            flag = "  SCAN grades!" if result["full_scans"] else ""
+            print(f"{name:<55} {timing}{flag}")
+            for line in result["plan"]:
+                print(f"    {line}")
+
+    flagged = [name for name, result in results.items() if result["full_scans"]]
+    if args.check and flagged:
+        print(f"Reports scanning the grades table: {', '.join(flagged)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
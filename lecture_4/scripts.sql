@@ -21,11 +21,162 @@ CREATE TABLE IF NOT EXISTS grades (
 
 -- Indexes
 
-CREATE INDEX IF NOT EXISTS idx_grades_student_id
-    ON grades(student_id);
+-- Covering indexes: lookups by student or subject, and the DISTINCT
+-- (student_id, subject, grade) checks below, are answered from the index
+-- alone. They replace the single-column indexes on student_id and subject.
+DROP INDEX IF EXISTS idx_grades_student_id;
+DROP INDEX IF EXISTS idx_grades_subject;
 
-CREATE INDEX IF NOT EXISTS idx_grades_subject
-    ON grades(subject);
+CREATE INDEX IF NOT EXISTS idx_grades_student_subject_grade
+    ON grades(student_id, subject, grade);
+
+CREATE INDEX IF NOT EXISTS idx_grades_subject_student_grade
+    ON grades(subject, student_id, grade);
+
+-- Aggregate tables
+
+-- Sum and count of the distinct (student_id, subject, grade) grades, as
+-- counted by the report queries, kept up to date by the triggers below so
+-- the reports don't scan the grades table.
+
+-- Table 3: student_grade_stats
+CREATE TABLE IF NOT EXISTS student_grade_stats (
+    student_id INTEGER PRIMARY KEY,
+    grade_sum INTEGER NOT NULL,
+    grade_count INTEGER NOT NULL,
+    average_grade REAL GENERATED ALWAYS AS (grade_sum * 1.0 / grade_count) VIRTUAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_student_grade_stats_average
+    ON student_grade_stats(average_grade);
+
+-- Table 4: subject_grade_stats
+CREATE TABLE IF NOT EXISTS subject_grade_stats (
+    subject TEXT PRIMARY KEY,
+    grade_sum INTEGER NOT NULL,
+    grade_count INTEGER NOT NULL,
+    average_grade REAL GENERATED ALWAYS AS (grade_sum * 1.0 / grade_count) VIRTUAL
+);
+
+-- Backfill for a database that already has grades (no-op on a new one)
+INSERT OR IGNORE INTO student_grade_stats (student_id, grade_sum, grade_count)
+SELECT student_id, SUM(grade), COUNT(*)
+FROM (
+    SELECT DISTINCT student_id, subject, grade
+    FROM grades
+    WHERE grade IS NOT NULL
+)
+GROUP BY student_id;
+
+INSERT OR IGNORE INTO subject_grade_stats (subject, grade_sum, grade_count)
+SELECT subject, SUM(grade), COUNT(*)
+FROM (
+    SELECT DISTINCT student_id, subject, grade
+    FROM grades
+    WHERE grade IS NOT NULL
+)
+GROUP BY subject;
+
+-- Triggers
+
+-- A grade counts once per (student_id, subject, grade): only the first
+-- matching row adds it, and only removing the last one takes it away.
+-- Updates (including ON UPDATE CASCADE of students.id) remove the old
+-- grade and add the new one.
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_insert
+AFTER INSERT ON grades
+WHEN NEW.grade IS NOT NULL
+    AND NOT EXISTS (
+        SELECT 1 FROM grades
+        WHERE student_id = NEW.student_id AND subject = NEW.subject
+            AND grade = NEW.grade AND id <> NEW.id
+    )
+BEGIN
+    INSERT INTO student_grade_stats (student_id, grade_sum, grade_count)
+    VALUES (NEW.student_id, NEW.grade, 1)
+    ON CONFLICT (student_id) DO UPDATE SET
+        grade_sum = grade_sum + excluded.grade_sum,
+        grade_count = grade_count + 1;
+
+    INSERT INTO subject_grade_stats (subject, grade_sum, grade_count)
+    VALUES (NEW.subject, NEW.grade, 1)
+    ON CONFLICT (subject) DO UPDATE SET
+        grade_sum = grade_sum + excluded.grade_sum,
+        grade_count = grade_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_delete
+AFTER DELETE ON grades
+WHEN OLD.grade IS NOT NULL
+    AND NOT EXISTS (
+        SELECT 1 FROM grades
+        WHERE student_id = OLD.student_id AND subject = OLD.subject AND grade = OLD.grade
+    )
+BEGIN
+    UPDATE student_grade_stats
+    SET grade_sum = grade_sum - OLD.grade, grade_count = grade_count - 1
+    WHERE student_id = OLD.student_id;
+
+    DELETE FROM student_grade_stats
+    WHERE student_id = OLD.student_id AND grade_count = 0;
+
+    UPDATE subject_grade_stats
+    SET grade_sum = grade_sum - OLD.grade, grade_count = grade_count - 1
+    WHERE subject = OLD.subject;
+
+    DELETE FROM subject_grade_stats
+    WHERE subject = OLD.subject AND grade_count = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_update_remove
+AFTER UPDATE OF student_id, subject, grade ON grades
+WHEN OLD.grade IS NOT NULL
+    AND (OLD.student_id IS NOT NEW.student_id OR OLD.subject IS NOT NEW.subject
+        OR OLD.grade IS NOT NEW.grade)
+    AND NOT EXISTS (
+        SELECT 1 FROM grades
+        WHERE student_id = OLD.student_id AND subject = OLD.subject AND grade = OLD.grade
+    )
+BEGIN
+    UPDATE student_grade_stats
+    SET grade_sum = grade_sum - OLD.grade, grade_count = grade_count - 1
+    WHERE student_id = OLD.student_id;
+
+    DELETE FROM student_grade_stats
+    WHERE student_id = OLD.student_id AND grade_count = 0;
+
+    UPDATE subject_grade_stats
+    SET grade_sum = grade_sum - OLD.grade, grade_count = grade_count - 1
+    WHERE subject = OLD.subject;
+
+    DELETE FROM subject_grade_stats
+    WHERE subject = OLD.subject AND grade_count = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_update_add
+AFTER UPDATE OF student_id, subject, grade ON grades
+WHEN NEW.grade IS NOT NULL
+    AND (OLD.student_id IS NOT NEW.student_id OR OLD.subject IS NOT NEW.subject
+        OR OLD.grade IS NOT NEW.grade)
+    AND NOT EXISTS (
+        SELECT 1 FROM grades
+        WHERE student_id = NEW.student_id AND subject = NEW.subject
+            AND grade = NEW.grade AND id <> NEW.id
+    )
+BEGIN
+    INSERT INTO student_grade_stats (student_id, grade_sum, grade_count)
+    VALUES (NEW.student_id, NEW.grade, 1)
+    ON CONFLICT (student_id) DO UPDATE SET
+        grade_sum = grade_sum + excluded.grade_sum,
+        grade_count = grade_count + 1;
+
+    INSERT INTO subject_grade_stats (subject, grade_sum, grade_count)
+    VALUES (NEW.subject, NEW.grade, 1)
+    ON CONFLICT (subject) DO UPDATE SET
+        grade_sum = grade_sum + excluded.grade_sum,
+        grade_count = grade_count + 1;
+END;
 
 -- Insert Sample Data
 
@@ -78,29 +229,26 @@ SELECT
     s.id,
     s.full_name,
     s.birth_year,
-    GROUP_CONCAT(gd.subject_grade, ', ') AS grades
+    (
+        SELECT GROUP_CONCAT(subject || ': ' || grade, ', ')
+        FROM (
+            SELECT DISTINCT subject, grade
+            FROM grades
+            WHERE student_id = s.id AND grade IS NOT NULL
+        )
+    ) AS grades
 FROM students s
-LEFT JOIN (
-    SELECT DISTINCT student_id, subject || ': ' || grade AS subject_grade
-    FROM grades
-) gd ON s.id = gd.student_id
 WHERE s.full_name = 'Alice Johnson'
-GROUP BY s.id, s.full_name, s.birth_year
 ORDER BY s.id;
 
 -- Calculate the average grade per student
 SELECT
     s.id,
     s.full_name,
-    AVG(g.grade) AS average_grade
+    st.average_grade
 FROM students s
-LEFT JOIN (
-    SELECT DISTINCT student_id, subject, grade
-    FROM grades
-    WHERE grade IS NOT NULL
-) g ON s.id = g.student_id
-GROUP BY s.id, s.full_name
-ORDER BY average_grade DESC;
+LEFT JOIN student_grade_stats st ON st.student_id = s.id
+ORDER BY st.average_grade DESC;
 
 -- All students born after 2004
 SELECT id, full_name, birth_year
@@ -109,30 +257,22 @@ WHERE birth_year > 2004
 ORDER BY birth_year;
 
 -- All subjects and their average grades
-SELECT subject, AVG(grade) AS average_grade
-FROM (
-    SELECT DISTINCT student_id, subject, grade
-    FROM grades
-    WHERE grade IS NOT NULL
-) AS unique_grades
-GROUP BY subject
+SELECT subject, average_grade
+FROM subject_grade_stats
 ORDER BY average_grade DESC;
 
 -- Top 3 students with the highest average grades
-SELECT s.id, s.full_name, AVG(g.grade) AS average_grade
-FROM students s
-JOIN (
-    SELECT DISTINCT student_id, subject, grade
-    FROM grades
-    WHERE grade IS NOT NULL
-) g ON s.id = g.student_id
-GROUP BY s.id, s.full_name
-ORDER BY average_grade DESC
+SELECT s.id, s.full_name, st.average_grade
+FROM student_grade_stats st
+JOIN students s ON s.id = st.student_id
+ORDER BY st.average_grade DESC
 LIMIT 3;
 
 -- All students who have scored below 80 in any subject
-SELECT DISTINCT s.id, s.full_name, s.birth_year
+SELECT s.id, s.full_name, s.birth_year
 FROM students s
-JOIN grades g ON s.id = g.student_id
-WHERE g.grade IS NOT NULL AND g.grade < 80
+WHERE EXISTS (
+    SELECT 1 FROM grades g
+    WHERE g.student_id = s.id AND g.grade < 80
+)
 ORDER BY s.id;
\ No newline at end of file
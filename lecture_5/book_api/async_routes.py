@@ -0,0 +1,274 @@
+"""
+Async versions of the book CRUD and search endpoints.
+
+Used instead of the sync routes in main.py when DB_MODE=async. Requests
+are served on the event loop with an AsyncSession (aiosqlite or asyncpg)
+rather than in Starlette's threadpool.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+import models
+import schemas
+import batch
+import cache
+import pagination
+import search_index
+import serialization
+import versioning
+from cache import response_cache
+from database import get_async_db
+from singleflight import search_flights
+
+router = APIRouter()
+
+
+async def _get_book_or_404(db: AsyncSession, book_id: int):
+    """Load a book by ID or raise 404"""
+    book = await db.get(models.Book, book_id)
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with ID {book_id} not found"
+        )
+
+    return book
+
+
+async def _commit_or_raise(db: AsyncSession, book_id=None):
+    """
+    Commit, turning a (title, author) conflict into a 400 response and a
+    concurrent modification of the book into a 412 response.
+    """
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Book with this title and author already exists"
+        )
+    except StaleDataError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Book with ID {book_id} has been modified"
+        )
+
+
+@router.get("/books", response_model=List[schemas.BookResponse])
+async def get_all_books(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    author: Optional[str] = None,
+    year: Optional[int] = None,
+    after: Optional[str] = None,
+    sort: pagination.SortField = "id",
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get all books with optional filters"""
+    key = cache.search_key(
+        "books", skip=skip, limit=limit, author=author, year=year, after=after, sort=sort
+    )
+    cached = response_cache.get(cache.SEARCH, key)
+    if cached is not None:
+        return versioning.respond(cached, if_none_match)
+
+    generation = response_cache.generation
+    etag = versioning.list_etag(await db.scalar(versioning.table_version_query), key)
+    if versioning.matches(if_none_match, etag):
+        return versioning.not_modified(etag)
+
+    query = select(*serialization.BOOK_COLUMNS)
+    query = search_index.apply_text_filters(query, db.bind, author=author)
+
+    if year:
+        query = query.filter(models.Book.year == year)
+
+    query = pagination.apply_keyset(query, sort, after)
+
+    books = (await db.execute(query.offset(skip).limit(limit))).all()
+
+    headers = pagination.next_cursor_headers(books, sort, limit)
+    if etag:
+        headers["ETag"] = etag
+
+    payload = cache.books_payload(books, headers)
+    response_cache.set(cache.SEARCH, key, payload, generation)
+    return payload.to_response()
+
+
+@router.get("/books/search/", response_model=List[schemas.BookResponse])
+async def search_books(
+    db: AsyncSession = Depends(get_async_db),
+    title: Optional[str] = None,
+    author: Optional[str] = None,
+    year: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    ranked: bool = False,
+    after: Optional[str] = None,
+    sort: pagination.SortField = "id",
+    if_none_match: Optional[str] = Header(None)
+):
+    """Search books by title, author, or year"""
+    if ranked and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for ranked search"
+        )
+
+    key = cache.search_key(
+        "search", title=title, author=author, year=year, skip=skip, limit=limit,
+        ranked=ranked, after=after, sort=sort
+    )
+    cached = response_cache.get(cache.SEARCH, key)
+    if cached is not None:
+        return versioning.respond(cached, if_none_match)
+
+    generation = response_cache.generation
+    etag = versioning.list_etag(await db.scalar(versioning.table_version_query), key)
+    if versioning.matches(if_none_match, etag):
+        return versioning.not_modified(etag)
+
+    async def load():
+        query = select(*serialization.BOOK_COLUMNS)
+        query = search_index.apply_text_filters(
+            query, db.bind, title=title, author=author, ranked=ranked
+        )
+
+        if year:
+            query = query.filter(models.Book.year == year)
+
+        if not ranked:
+            query = pagination.apply_keyset(query, sort, after)
+
+        books = (await db.execute(query.offset(skip).limit(limit))).all()
+
+        headers = {} if ranked else pagination.next_cursor_headers(books, sort, limit)
+        if etag:
+            headers["ETag"] = etag
+
+        payload = cache.books_payload(books, headers)
+        response_cache.set(cache.SEARCH, key, payload, generation)
+        return payload
+
+    # Identical searches running right now share one query and its payload;
+    # the ETag (table version) in the key keeps them on the same catalog
+    payload = await search_flights.do_async((key, generation, etag), load)
+    return versioning.respond(payload, if_none_match)
+
+
+@router.get("/books/{book_id}", response_model=schemas.BookResponse)
+async def get_book(
+    book_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get a specific book by ID"""
+    cached = response_cache.get(cache.BOOK, book_id)
+    if cached is not None:
+        return versioning.respond(cached, if_none_match)
+
+    generation = response_cache.generation
+
+    if if_none_match:
+        version = await db.scalar(
+            select(models.Book.version).where(models.Book.id == book_id)
+        )
+        etag = versioning.book_etag(book_id, version)
+        if version is not None and versioning.matches(if_none_match, etag):
+            return versioning.not_modified(etag)
+
+    book = (await db.execute(
+        select(*serialization.BOOK_COLUMNS, models.Book.version)
+        .where(models.Book.id == book_id)
+    )).first()
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with ID {book_id} not found"
+        )
+
+    payload = cache.book_payload(book, {"ETag": versioning.book_etag(book.id, book.version)})
+    response_cache.set(cache.BOOK, book_id, payload, generation)
+    return payload.to_response()
+
+
+@router.post("/books/batch-get", response_model=schemas.BatchGetResponse)
+async def batch_get_books(request: schemas.BatchGetRequest, db: AsyncSession = Depends(get_async_db)):
+    """Get many books by ID, in request order, with the missing IDs"""
+    ids = batch.unique_ids(request.ids)
+    rows = []
+    for chunk in batch.id_chunks(ids):
+        rows.extend(await db.execute(batch.select_books(chunk)))
+
+    return Response(content=batch.batch_json(ids, rows), media_type="application/json")
+
+
+@router.post("/books", response_model=schemas.BookResponse, status_code=status.HTTP_201_CREATED)
+async def create_book(
+    response: Response,
+    book_data: schemas.BookCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new book"""
+    new_book = models.Book(
+        title=book_data.title,
+        author=book_data.author,
+        year=book_data.year
+    )
+
+    db.add(new_book)
+    await _commit_or_raise(db)
+    response_cache.invalidate()
+    response.headers["ETag"] = versioning.book_etag(new_book.id, new_book.version)
+
+    return new_book
+
+
+@router.put("/books/{book_id}", response_model=schemas.BookResponse)
+async def update_book(
+    book_id: int,
+    book_data: schemas.BookUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    if_match: Optional[str] = Header(None)
+):
+    """Update an existing book, optionally only if it matches the If-Match ETag"""
+    book = await _get_book_or_404(db, book_id)
+    versioning.check_if_match(if_match, book)
+
+    for field, value in book_data.model_dump(exclude_none=True).items():
+        setattr(book, field, value)
+
+    await _commit_or_raise(db, book_id)
+    response_cache.invalidate(book_id)
+    response.headers["ETag"] = versioning.book_etag(book.id, book.version)
+
+    return book
+
+
+@router.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_book(
+    book_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    if_match: Optional[str] = Header(None)
+):
+    """Delete a book, optionally only if it matches the If-Match ETag"""
+    book = await _get_book_or_404(db, book_id)
+    versioning.check_if_match(if_match, book)
+
+    await db.delete(book)
+    await _commit_or_raise(db, book_id)
+    response_cache.invalidate(book_id)
+
+    return None
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Import-time (cold start) report for the Book API and the lecture_6
+healthcheck service.
+
+Imports each app's `main` module in a fresh interpreter with
+`python -X importtime`, and reports the median import time and the
+slowest modules. Also checks that importing the Book API doesn't create
+or open its database. Exits with status 1 when a target goes over its
+budget, so it can guard against startup regressions.
+
+Usage:
+    python bench_import.py [--repeat 5] [--top 10] [--budget-ms book_api=800] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TARGETS = {
+    "book_api": HERE,
+    "healthcheck": os.path.join(HERE, "..", "..", "lecture_6"),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report the import time of the apps")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="TARGET=MS",
+                        help="Fail if the median import time of TARGET is above MS")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    return parser.parse_args()
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) in import order
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        prefix, cumulative_us, name = line.split("|", 2)
+        self_us = int(prefix.split(":", 1)[1])
+        # Names are indented by two spaces per nesting level after one separator space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), self_us, int(cumulative_us), depth))
+    return modules
+
+
+def measure(directory, database_path):
+    """Import `main` from directory in a new interpreter and return the parsed timings"""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=directory, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing main from {directory} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def report_target(name, directory, repeat, top):
+    workdir = tempfile.mkdtemp(prefix="book_api_import_")
+    database_path = os.path.join(workdir, "untouched.db")
+
+    totals = []
+    modules = []
+    for _ in range(repeat):
+        modules = measure(directory, database_path)
+        totals.append(next(cumulative for module, _, cumulative, depth in modules
+                           if module == "main" and depth == 0))
+
+    slowest = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+    database_created = os.path.exists(database_path)
+    if database_created:
+        os.remove(database_path)
+    os.rmdir(workdir)
+
+    return {
+        "target": name,
+        "median_ms": round(statistics.median(totals) / 1000, 2),
+        "min_ms": round(min(totals) / 1000, 2),
+        "database_touched": database_created,
+        "slowest_self_ms": [
+            {"module": module, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cumulative_us / 1000, 2)}
+            for module, self_us, cumulative_us, _ in slowest
+        ],
+    }
+
+
+def main():
+    args = parse_args()
+    budgets = {}
+    for budget in args.budget_ms:
+        target, _, value = budget.partition("=")
+        if target not in TARGETS or not value:
+            sys.exit(f"Invalid budget '{budget}', expected one of {', '.join(TARGETS)}=MS")
+        budgets[target] = float(value)
+
+    results = [report_target(name, directory, args.repeat, args.top) for name, directory in TARGETS.items()]
+
+    failures = []
+    for result in results:
+        budget = budgets.get(result["target"])
+        result["budget_ms"] = budget
+        if budget is not None and result["median_ms"] > budget:
+            failures.append(f"{result['target']}: {result['median_ms']} ms > {budget} ms")
+        if result["database_touched"]:
+            failures.append(f"{result['target']}: importing the app created the database")
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        for result in results:
+            budget = f" (budget {result['budget_ms']} ms)" if result["budget_ms"] is not None else ""
+            print(f"📦 {result['target']}: import main {result['median_ms']} ms median{budget}")
+            for module in result["slowest_self_ms"]:
+                print(f"  {module['module']:<40} self {module['self_ms']:>7.2f} ms   "
+                      f"cumulative {module['cumulative_ms']:>7.2f} ms")
+        for failure in failures:
+            print(f"❌ {failure}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Load-test and latency benchmark for the Book API.
+
+Seeds a catalog of the requested size, drives the API in-process with an
+async HTTP client (no network, no server) over a sweep of concurrency
+levels, and reports throughput and p50/p95/p99 latency per scenario as
+JSON, so runs can be compared across commits.
+
+Scenarios:
+    get_book        GET /books/{id} for random IDs
+    search          GET /books/search/ with random title substrings
+    offset_deep     GET /books?skip=... reading random pages deep in the catalog
+    cursor_deep     GET /books?after=... reading the same pages with a cursor
+    create          POST /books with unique books (write contention)
+    mixed           95% reads (get_book/search), 5% writes (create/update)
+
+Usage:
+    pip install -r ../requirements-bench.txt
+    python benchmark.py --rows 100000 --concurrency 1,8,32 --output bench.json
+    DB_MODE=async python benchmark.py --scenarios search,mixed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SCENARIOS = ("get_book", "search", "offset_deep", "cursor_deep", "create", "mixed")
+
+SEED_CHUNK_SIZE = 10000
+
+# Books per page read by offset_deep and cursor_deep
+DEEP_PAGE_SIZE = 100
+
+WORDS = (
+    "river", "shadow", "garden", "empire", "winter", "secret", "silver", "ocean",
+    "forest", "letter", "island", "memory", "stone", "dragon", "night", "harbor",
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Book API in-process")
+    parser.add_argument("--rows", type=int, default=10000,
+                        help="Books in the catalog (e.g. 10000 to 10000000)")
+    parser.add_argument("--database", help="SQLite file to use, reused if already seeded "
+                        "(default: a temporary file)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", default="1,8,32,128",
+                        help="Comma-separated concurrency levels to sweep")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Requests per scenario and concurrency level")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+def title_for(i):
+    return f"The {WORDS[i % len(WORDS)]} of {WORDS[(i // len(WORDS)) % len(WORDS)]} {i}"
+
+
+def seed_catalog(engine, rows):
+    """Insert books until the catalog has `rows` books, returns the final count"""
+    from sqlalchemy import func, insert, select
+    import models
+
+    with engine.connect() as conn:
+        existing = conn.scalar(select(func.count()).select_from(models.Book))
+
+    for start in range(existing, rows, SEED_CHUNK_SIZE):
+        end = min(start + SEED_CHUNK_SIZE, rows)
+        with engine.begin() as conn:
+            conn.execute(insert(models.Book), [
+                {"title": title_for(i), "author": f"Author {i % 5000}", "year": 1900 + i % 125}
+                for i in range(start, end)
+            ])
+        print(f"  seeded {end}/{rows} books", file=sys.stderr)
+
+    return max(existing, rows)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Workload:
+    """Builds the requests of each scenario"""
+
+    def __init__(self, client, rows, rng):
+        self.client = client
+        self.rows = rows
+        self.rng = rng
+        self.created = 0
+        # Deep pages start anywhere in the last fifth of the catalog; a
+        # different page per request, so the response cache can't answer
+        # most of them and offset and keyset costs are what is compared
+        self.deep_start = int(rows * 0.8)
+        self.deep_end = max(self.deep_start, rows - DEEP_PAGE_SIZE)
+
+    def _deep_position(self):
+        return self.rng.randint(self.deep_start, self.deep_end)
+
+    def _random_id(self):
+        return self.rng.randint(1, self.rows)
+
+    def _search_params(self):
+        return {"title": self.rng.choice(WORDS)[: self.rng.randint(3, 6)], "limit": 20}
+
+    async def get_book(self):
+        return await self.client.get(f"/books/{self._random_id()}")
+
+    async def search(self):
+        return await self.client.get("/books/search/", params=self._search_params())
+
+    async def offset_deep(self):
+        return await self.client.get("/books", params={
+            "skip": self._deep_position(), "limit": DEEP_PAGE_SIZE
+        })
+
+    async def cursor_deep(self):
+        import pagination
+
+        # Seeded books have IDs 1..rows, so the page after ID n is the page
+        # at offset n
+        position = self._deep_position()
+        return await self.client.get("/books", params={
+            "after": pagination.encode_cursor("id", position, position), "limit": DEEP_PAGE_SIZE
+        })
+
+    async def create(self):
+        self.created += 1
+        return await self.client.post("/books", json={
+            "title": f"Benchmark book {time.time_ns()} {self.created}",
+            "author": "Benchmark",
+            "year": 2000
+        })
+
+    async def update(self):
+        return await self.client.put(f"/books/{self._random_id()}", json={
+            "year": self.rng.randint(1900, 2024)
+        })
+
+    async def mixed(self):
+        roll = self.rng.random()
+        if roll < 0.60:
+            return await self.get_book()
+        if roll < 0.95:
+            return await self.search()
+        if roll < 0.975:
+            return await self.create()
+        return await self.update()
+
+
+async def run_level(workload, scenario, concurrency, total):
+    """Send `total` requests of a scenario with `concurrency` workers"""
+    send = getattr(workload, scenario)
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await send()
+                failed = response.status_code >= 500
+            except Exception:
+                failed = True
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args, rows):
+    import httpx
+    import database
+    from main import app
+
+    rng = random.Random(args.seed)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(",")]
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        workload = Workload(client, rows, rng)
+
+        for scenario in scenarios:
+            for concurrency in levels:
+                print(f"  {scenario} @ {concurrency}", file=sys.stderr)
+                results.append(await run_level(workload, scenario, concurrency, args.requests))
+
+    await database.dispose_engines()
+
+    return results
+
+
+def main():
+    args = parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # Settings are read when the app modules are imported, so set them first
+    workdir = None if args.database else tempfile.mkdtemp(prefix="book_api_bench_")
+    db_path = args.database or os.path.join(workdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    if args.no_cache:
+        os.environ["CACHE_BACKEND"] = "none"
+
+    import database
+    import schema
+
+    # The in-process transport doesn't run the app's lifespan, so set up
+    # the schema here
+    engine = database.get_engine()
+    schema.init_db(engine)
+
+    print(f"Seeding {args.rows} books into {db_path}", file=sys.stderr)
+    rows = seed_catalog(engine, args.rows)
+
+    results = asyncio.run(run(args, rows))
+
+    if workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows": rows,
+            "db_mode": database.DB_MODE,
+            "cache": not args.no_cache,
+            "requests_per_level": args.requests,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
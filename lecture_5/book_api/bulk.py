@@ -0,0 +1,270 @@
+"""
+Bulk creation of books.
+
+Items are validated one by one, deduplicated within the request and then
+processed in chunks: set-based SELECTs find the books that already
+exist, multi-row INSERTs add the rest, and each chunk is committed once.
+Like batch-get, no statement binds more than MAX_STATEMENT_PARAMETERS
+values, so a chunk's lookups and inserts are split into as many
+statements as that takes. Books created concurrently by other writers are
+caught by the unique (title, author) index with ON CONFLICT DO NOTHING.
+
+With on_conflict=update, existing books get the year of the item; items
+without a year leave the book unchanged (as in PUT) and are reported as
+duplicates.
+"""
+
+import json
+from typing import Literal
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+import batch
+import models
+import schemas
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+
+# Bound parameters per statement, the same cap as batch-get's IN queries
+# (below SQLite's limit of 999 on older builds)
+MAX_STATEMENT_PARAMETERS = batch.IN_CHUNK_SIZE
+
+# A (title, author) key binds two values, an inserted row every column but id
+LOOKUP_KEYS_PER_STATEMENT = MAX_STATEMENT_PARAMETERS // 2
+INSERT_ROWS_PER_STATEMENT = MAX_STATEMENT_PARAMETERS // (len(models.Book.__table__.columns) - 1)
+
+DUPLICATE_DETAIL = "Book with this title and author already exists"
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+ConflictAction = Literal["skip", "update"]
+
+
+class BulkPayloadError(ValueError):
+    """Raised when a bulk request body can't be parsed at all"""
+
+
+class _InvalidLine:
+    """Placeholder for an NDJSON line that isn't valid JSON"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def parse_payload(body: bytes, content_type: str):
+    """
+    Parse a bulk request body into a list of items.
+
+    The body is either a JSON array or, for NDJSON content types, one JSON
+    object per line. Malformed NDJSON lines are kept as items so they get
+    their own error in the results.
+
+    Raises:
+        BulkPayloadError: If the body isn't UTF-8, or a JSON body is
+            malformed or not an array
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+
+    if media_type in NDJSON_MEDIA_TYPES:
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise BulkPayloadError(f"Request body is not valid UTF-8: {e}")
+
+        items = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(_InvalidLine(f"Invalid JSON: {e}"))
+        return items
+
+    try:
+        items = json.loads(body)
+    except ValueError as e:
+        raise BulkPayloadError(f"Invalid JSON: {e}")
+
+    if not isinstance(items, list):
+        raise BulkPayloadError("Request body must be a JSON array of books")
+
+    return items
+
+
+def _insert_ignoring_duplicates(db):
+    """Build an INSERT for books that skips rows violating the (title, author) index"""
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        return sqlite.insert(models.Book).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(models.Book).on_conflict_do_nothing()
+
+    return insert(models.Book)
+
+
+def _slices(rows, size):
+    """Split a list into consecutive lists of at most `size` items"""
+    return [rows[start:start + size] for start in range(0, len(rows), size)]
+
+
+def _find_existing(db, keys):
+    """Map (title, author) keys to the IDs of books that already exist"""
+    return {
+        (title, author): book_id
+        for part in _slices(keys, LOOKUP_KEYS_PER_STATEMENT)
+        for book_id, title, author in db.execute(
+            select(models.Book.id, models.Book.title, models.Book.author)
+            .where(tuple_(models.Book.title, models.Book.author).in_(part))
+        )
+    }
+
+
+def _insert_new(db, books):
+    """Insert books, skipping existing ones; map the (title, author) of inserted books to their IDs"""
+    statement = _insert_ignoring_duplicates(db)
+    return {
+        (title, author): book_id
+        for part in _slices(books, INSERT_ROWS_PER_STATEMENT)
+        for book_id, title, author in db.execute(
+            statement
+            .values([book.model_dump() for book in part])
+            .returning(models.Book.id, models.Book.title, models.Book.author)
+        )
+    }
+
+
+def _validate(index, item):
+    """Validate one raw item, returning the book or an invalid result"""
+    if isinstance(item, _InvalidLine):
+        return None, schemas.BulkItemResult(index=index, status="invalid", detail=item.error)
+
+    try:
+        return schemas.BookCreate.model_validate(item), None
+    except ValidationError as e:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'body'}: {error['msg']}"
+            for error in e.errors()
+        )
+        return None, schemas.BulkItemResult(index=index, status="invalid", detail=detail)
+
+
+def _process_chunk(db, chunk, on_conflict: ConflictAction):
+    """
+    Insert one chunk of (index, book) pairs and commit it.
+
+    Returns:
+        list: BulkItemResult for every item of the chunk
+    """
+    existing = _find_existing(db, [(book.title, book.author) for _, book in chunk])
+
+    results = []
+    new_rows = []
+    changed_rows = []
+
+    for index, book in chunk:
+        book_id = existing.get((book.title, book.author))
+        if book_id is None:
+            new_rows.append((index, book))
+        elif on_conflict == "update" and book.year is not None:
+            changed_rows.append({"book_id": book_id, "new_year": book.year})
+            results.append(schemas.BulkItemResult(index=index, status="updated", id=book_id))
+        else:
+            results.append(schemas.BulkItemResult(
+                index=index,
+                status="duplicate",
+                id=book_id,
+                detail=DUPLICATE_DETAIL
+            ))
+
+    if new_rows:
+        created = _insert_new(db, [book for _, book in new_rows])
+
+        # Rows missing from RETURNING were inserted by someone else meanwhile
+        raced = {}
+        if len(created) < len(new_rows):
+            raced = _find_existing(db, [
+                (book.title, book.author) for _, book in new_rows
+                if (book.title, book.author) not in created
+            ])
+
+        for index, book in new_rows:
+            key = (book.title, book.author)
+            if key in created:
+                results.append(schemas.BulkItemResult(index=index, status="created", id=created[key]))
+            else:
+                results.append(schemas.BulkItemResult(
+                    index=index,
+                    status="duplicate",
+                    id=raced.get(key),
+                    detail=DUPLICATE_DETAIL
+                ))
+
+    if changed_rows:
+        books = models.Book.__table__
+        db.execute(
+            update(books)
+            .where(books.c.id == bindparam("book_id"))
+            .values(year=bindparam("new_year"), version=books.c.version + 1),
+            changed_rows
+        )
+
+    db.commit()
+    return results
+
+
+def create_books(db, items, chunk_size=DEFAULT_CHUNK_SIZE, on_conflict: ConflictAction = "skip"):
+    """
+    Create books from a list of raw items.
+
+    Args:
+        db: Database session
+        items (list): Parsed request items (see parse_payload)
+        chunk_size (int): Number of books committed together
+        on_conflict (str): "skip" existing books or "update" their year
+            (books stay unchanged for items without a year)
+
+    Returns:
+        BulkCreateResponse: Counters and per-item results in request order
+    """
+    results = []
+    pending = []
+    seen = {}
+
+    for index, item in enumerate(items):
+        book, invalid = _validate(index, item)
+        if invalid:
+            results.append(invalid)
+            continue
+
+        key = (book.title, book.author)
+        if key in seen:
+            results.append(schemas.BulkItemResult(
+                index=index,
+                status="duplicate",
+                detail=f"Duplicate of item {seen[key]} in this request"
+            ))
+            continue
+
+        seen[key] = index
+        pending.append((index, book))
+
+    for start in range(0, len(pending), chunk_size):
+        results.extend(_process_chunk(db, pending[start:start + chunk_size], on_conflict))
+
+    results.sort(key=lambda result: result.index)
+
+    counts = {"created": 0, "updated": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        counts[result.status] += 1
+
+    return schemas.BulkCreateResponse(
+        created=counts["created"],
+        updated=counts["updated"],
+        duplicates=counts["duplicate"],
+        invalid=counts["invalid"],
+        results=results
+    )
@@ -0,0 +1,237 @@
+"""
+Read-through response cache for book lookups and searches.
+
+Serialized responses are cached per book ID and per normalized set of
+search parameters, so repeated reads skip both the database and JSON
+serialization. Writes invalidate the affected book and all
+cached searches.
+
+The storage is pluggable: ResponseCache works with any CacheBackend, the
+in-process MemoryCache (TTL + LRU) is used by default.
+"""
+
+import json
+import string
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from fastapi import Response
+import serialization
+from config import settings
+
+BOOK = "book"
+SEARCH = "search"
+
+
+class CachedResponse(NamedTuple):
+    """A serialized JSON response body with its extra headers"""
+
+    body: bytes
+    headers: dict
+
+    def to_response(self):
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
+
+
+class CacheBackend:
+    """Storage interface for ResponseCache, keys are (namespace, key) pairs"""
+
+    def get(self, namespace, key):
+        """Return the cached value or None"""
+        raise NotImplementedError
+
+    def set(self, namespace, key, value):
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        raise NotImplementedError
+
+    def clear_namespace(self, namespace):
+        """Drop every entry of a namespace"""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing, used to switch caching off"""
+
+    def get(self, namespace, key):
+        return None
+
+    def set(self, namespace, key, value):
+        pass
+
+    def delete(self, namespace, key):
+        pass
+
+    def clear_namespace(self, namespace):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class MemoryCache(CacheBackend):
+    """
+    Thread-safe in-process cache with a TTL and LRU eviction.
+
+    Args:
+        ttl (float): Seconds an entry stays valid
+        max_entries (int): Entries kept before the least recently used is evicted
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[(namespace, key)]
+                return None
+
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace, key, value):
+        with self._lock:
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((namespace, key))
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def clear_namespace(self, namespace):
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+BACKENDS = {
+    "memory": lambda: MemoryCache(ttl=settings.cache_ttl, max_entries=settings.cache_max_entries),
+    "none": NullCache,
+}
+
+
+class ResponseCache:
+    """Cache of serialized book responses with hit/miss counters"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        """
+        Counter bumped on every invalidation.
+
+        Read it before querying the database and pass it to set(), so a
+        result read before a concurrent write is not cached after it.
+        """
+        return self._generation
+
+    def get(self, namespace, key):
+        value = self.backend.get(namespace, key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, namespace, key, value, generation):
+        # Checked and stored under the lock invalidations hold, so a result
+        # read before a concurrent write can't be stored after its invalidation
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set(namespace, key, value)
+
+    def invalidate(self, *book_ids):
+        """Forget the given books and every cached search"""
+        with self._lock:
+            self._generation += 1
+            for book_id in book_ids:
+                self.backend.delete(BOOK, book_id)
+            self.backend.clear_namespace(SEARCH)
+
+    def invalidate_all(self):
+        """Forget every cached book and search"""
+        with self._lock:
+            self._generation += 1
+            self.backend.clear_namespace(BOOK)
+            self.backend.clear_namespace(SEARCH)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def metric_samples(self):
+        """Samples for the /metrics endpoint (see metrics.register_collector)"""
+        return [
+            ("book_api_cache_hits_total", "counter", "Response cache hits", self.hits),
+            ("book_api_cache_misses_total", "counter", "Response cache misses", self.misses),
+            ("book_api_cache_entries", "gauge", "Responses currently cached", len(self.backend)),
+        ]
+
+
+_ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def search_key(endpoint, **params):
+    """
+    Normalize search parameters into a cache key.
+
+    Unset parameters are dropped and text filters are lowercased, ASCII
+    letters only: that is all SQL LIKE ignores, while full Unicode
+    case-folding would give e.g. "straße" and "STRASSE", which match
+    different books, the same key. Whitespace is kept, it is part of the
+    searched substring.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if name in ("title", "author"):
+            value = value.translate(_ASCII_LOWERCASE)
+        normalized[name] = value
+    return f"{endpoint}:{json.dumps(normalized, sort_keys=True)}"
+
+
+def book_payload(row, headers=None):
+    """Serialize one book row (see serialization.BOOK_COLUMNS) into a cacheable response"""
+    return CachedResponse(serialization.book_json(row), headers or {})
+
+
+def books_payload(rows, headers=None):
+    """Serialize a list of book rows into a cacheable response"""
+    return CachedResponse(serialization.books_json(rows), headers or {})
+
+
+response_cache = ResponseCache(BACKENDS[settings.cache_backend]())
@@ -0,0 +1,126 @@
+"""
+Application settings loaded from environment variables (and .env).
+
+Environment variables:
+    DATABASE_URL          Database URL (default: sqlite:///./books.db)
+    DB_MODE               "sync" or "async" routes (default: sync)
+    INIT_SCHEMA           Create tables/indexes when the app starts, turned off by
+                          serve.py which does it once before forking (default: true)
+    DB_POOL_SIZE          Connections kept in the pool (default: 5)
+    DB_MAX_OVERFLOW       Extra connections allowed above the pool size (default: 10)
+    DB_POOL_TIMEOUT       Seconds to wait for a free connection (default: 30)
+    DB_POOL_RECYCLE       Recycle connections older than this many seconds, -1 = never
+    DB_POOL_PRE_PING      Test connections before handing them out (default: false)
+    SQLITE_JOURNAL_MODE   PRAGMA journal_mode (default: WAL)
+    SQLITE_SYNCHRONOUS    PRAGMA synchronous (default: NORMAL)
+    SQLITE_CACHE_SIZE     PRAGMA cache_size, negative values are KiB (default: -64000)
+    SQLITE_MMAP_SIZE      PRAGMA mmap_size in bytes (default: 268435456)
+    SQLITE_TEMP_STORE     PRAGMA temp_store (default: MEMORY)
+    SQLITE_BUSY_TIMEOUT   PRAGMA busy_timeout in milliseconds (default: 5000)
+    CACHE_BACKEND         Response cache backend, "memory" or "none" (default: memory)
+    CACHE_TTL             Seconds a cached response stays valid (default: 30)
+    CACHE_MAX_ENTRIES     Cached responses kept before LRU eviction (default: 10000)
+    SLOW_QUERY_MS         Log statements slower than this many milliseconds with their
+                          parameters, 0 = off (default: 0)
+"""
+
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+CACHE_BACKENDS = {"MEMORY", "NONE"}
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_choice(name, default, choices):
+    value = os.getenv(name, default).strip().upper()
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(sorted(choices))}, got '{value}'")
+    return value
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Database, pool, cache and instrumentation configuration of the Book API"""
+
+    database_url: str = "sqlite:///./books.db"
+    db_mode: str = "sync"
+    init_schema: bool = True
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -64000
+    sqlite_mmap_size: int = 268435456
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout: int = 5000
+
+    cache_backend: str = "memory"
+    cache_ttl: float = 30
+    cache_max_entries: int = 10000
+
+    slow_query_ms: float = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build settings from the environment, loading .env first"""
+        load_dotenv()
+        defaults = cls()
+
+        return cls(
+            database_url=os.getenv("DATABASE_URL", defaults.database_url),
+            db_mode=os.getenv("DB_MODE", defaults.db_mode).strip().lower(),
+            init_schema=_env_bool("INIT_SCHEMA", defaults.init_schema),
+            pool_size=int(os.getenv("DB_POOL_SIZE", defaults.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", defaults.max_overflow)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", defaults.pool_timeout)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", defaults.pool_recycle)),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", defaults.pool_pre_ping),
+            sqlite_journal_mode=_env_choice(
+                "SQLITE_JOURNAL_MODE", defaults.sqlite_journal_mode, JOURNAL_MODES
+            ),
+            sqlite_synchronous=_env_choice(
+                "SQLITE_SYNCHRONOUS", defaults.sqlite_synchronous, SYNCHRONOUS_MODES
+            ),
+            sqlite_cache_size=int(os.getenv("SQLITE_CACHE_SIZE", defaults.sqlite_cache_size)),
+            sqlite_mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", defaults.sqlite_mmap_size)),
+            sqlite_temp_store=_env_choice(
+                "SQLITE_TEMP_STORE", defaults.sqlite_temp_store, TEMP_STORES
+            ),
+            sqlite_busy_timeout=int(os.getenv("SQLITE_BUSY_TIMEOUT", defaults.sqlite_busy_timeout)),
+            cache_backend=_env_choice(
+                "CACHE_BACKEND", defaults.cache_backend, CACHE_BACKENDS
+            ).lower(),
+            cache_ttl=float(os.getenv("CACHE_TTL", defaults.cache_ttl)),
+            cache_max_entries=int(os.getenv("CACHE_MAX_ENTRIES", defaults.cache_max_entries)),
+            slow_query_ms=float(os.getenv("SLOW_QUERY_MS", defaults.slow_query_ms)),
+        )
+
+    def sqlite_pragmas(self):
+        """PRAGMA statements applied to every new SQLite connection"""
+        return [
+            f"PRAGMA journal_mode={self.sqlite_journal_mode}",
+            f"PRAGMA synchronous={self.sqlite_synchronous}",
+            f"PRAGMA cache_size={self.sqlite_cache_size}",
+            f"PRAGMA mmap_size={self.sqlite_mmap_size}",
+            f"PRAGMA temp_store={self.sqlite_temp_store}",
+            f"PRAGMA busy_timeout={self.sqlite_busy_timeout}",
+        ]
+
+
+settings = Settings.from_env()
@@ -0,0 +1,48 @@
+"""
+Shared pytest fixtures for the Book API tests.
+
+Settings are read when the app modules are imported, so DATABASE_URL is
+pointed at a temporary SQLite database before that. Run the tests with
+DB_MODE=async to exercise the async routes instead of the sync ones.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_DATA_DIR = tempfile.mkdtemp(prefix="book_api_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATA_DIR, 'books.db')}"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import database
+import main
+from cache import response_cache
+
+
+@pytest.fixture
+def client():
+    """Client of the app, starting from an empty catalog and response cache"""
+    with TestClient(main.app) as client:
+        with database.get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM books"))
+        response_cache.invalidate_all()
+        yield client
+
+
+@pytest.fixture
+def create_book(client):
+    """Create a book through the API and return its JSON"""
+    def create(title, author="Author", year=2000):
+        response = client.post("/books", json={"title": title, "author": author, "year": year})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return create
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
@@ -1,23 +1,91 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from config import settings
+
+# Get database URL from environment (see config.py)
+DATABASE_URL = settings.database_url
+
+# "sync" serves the API with blocking sessions, "async" with AsyncSession
+DB_MODE = settings.db_mode
+
+# Async drivers used for each database in async mode
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+def engine_options(url):
+    """Keyword arguments for create_engine() / create_async_engine() from settings"""
+    url = make_url(url)
+    options = {"pool_pre_ping": settings.pool_pre_ping}
+    
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}  # Required for SQLite
+        
+        # In-memory databases use a single-connection pool without sizing
+        if url.database in (None, "", ":memory:"):
+            return options
+    
+    options.update(
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle
+    )
+    return options
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection (WAL, cache, mmap, busy timeout)"""
+    cursor = dbapi_connection.cursor()
+    for pragma in settings.sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+def install_sqlite_pragmas(sync_engine):
+    """Apply the SQLite PRAGMAs from settings to connections of an engine"""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+
+# Engines are created on first use, so importing the app doesn't touch
+# the database; see get_engine() and get_async_engine()
+_engine = None
+_async_engine = None
+_engine_hooks = []
+
+def on_engine_created(hook):
+    """Call hook(sync_engine) for every engine, including ones already created"""
+    _engine_hooks.append(hook)
+    for created in (_engine, _async_engine and _async_engine.sync_engine):
+        if created is not None:
+            hook(created)
 
-# Load environment variables
-load_dotenv()
+def _setup_engine(sync_engine):
+    install_sqlite_pragmas(sync_engine)
+    for hook in _engine_hooks:
+        hook(sync_engine)
 
-# Get database URL from environment
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./books.db")
+def get_engine():
+    """The SQLAlchemy engine, created on the first call"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+        _setup_engine(_engine)
+        SessionLocal.configure(bind=_engine)
+    return _engine
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite
-)
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that creates the engine when the first session is opened"""
+    
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 
 # Create Base class
 Base = declarative_base()
@@ -30,7 +98,64 @@ def get_db():
     finally:
         db.close()
 
+def to_async_url(url):
+    """Switch a database URL to the async driver of its backend"""
+    url = make_url(url.replace("postgres://", "postgresql://", 1))
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    
+    if driver is None:
+        return url
+    
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
+# Async sessions, only used in async mode
+AsyncSessionLocal = None
+
+def get_async_engine():
+    """The async engine (DB_MODE=async), created on the first call"""
+    global _async_engine, AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        
+        _async_engine = create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+        _setup_engine(_async_engine.sync_engine)
+        AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+def __getattr__(name):
+    # `engine` and `async_engine` are still importable, creating them on access
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine() if DB_MODE == "async" else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def dispose_engines():
+    """Close the pooled connections of every engine created so far"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+def _dispose_after_fork():
+    """Forget pooled connections inherited from the parent, without closing them for it"""
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+# Worker processes forked from a process that already used the engine
+# (gunicorn --preload, multiprocessing) must open their own connections
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+# Dependency to get an async DB session
+async def get_async_db():
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def create_tables():
     """Create all tables"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     print("✅ Database tables created successfully!")
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Streaming export of the book catalog as NDJSON or CSV.
+
+Rows are fetched in batches with `yield_per` and written to the response
+as soon as they are read, so memory use doesn't depend on catalog size.
+"""
+
+import csv
+import io
+from typing import Literal
+
+from sqlalchemy import select
+import models
+import search_index
+import serialization
+from database import SessionLocal
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ("id", "title", "author", "year")
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_book_rows(author=None, year=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield batches of (id, title, author, year) tuples ordered by id.
+
+    A dedicated session is opened for the duration of the export because
+    the generator outlives the request's dependency-injected session.
+    """
+    db = SessionLocal()
+    try:
+        query = select(
+            models.Book.id, models.Book.title, models.Book.author, models.Book.year
+        )
+        query = search_index.apply_text_filters(query, db.get_bind(), author=author)
+
+        if year:
+            query = query.filter(models.Book.year == year)
+
+        query = query.order_by(models.Book.id).execution_options(yield_per=batch_size)
+
+        for rows in db.execute(query).partitions():
+            yield rows
+    finally:
+        db.close()
+
+
+def iter_ndjson(batches):
+    """Serialize batches of rows as newline-delimited JSON chunks"""
+    for rows in batches:
+        yield b"".join(
+            serialization.dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n"
+            for row in rows
+        )
+
+
+def iter_csv(batches):
+    """Serialize batches of rows as CSV chunks, starting with a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def export_books(export_format: ExportFormat, author=None, year=None):
+    """Return a chunk iterator with the whole (filtered) catalog in the given format"""
+    batches = iter_book_rows(author=author, year=year)
+
+    if export_format == "csv":
+        return iter_csv(batches)
+
+    return iter_ndjson(batches)
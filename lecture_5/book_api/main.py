@@ -1,20 +1,60 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from contextlib import asynccontextmanager
 from typing import List, Optional
 import models
 import schemas
-from database import engine, get_db
-import uvicorn
+import batch
+import bulk
+import cache
+import export
+import metrics
+import pagination
+import schema
+import search_index
+import serialization
+import stats
+import versioning
+import database
+from cache import response_cache
+from config import settings
+from singleflight import search_flights
+from database import DB_MODE, get_db
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create tables, indexes and triggers on startup, unless serve.py already
+    did it before starting the workers, and close connections on shutdown
+    """
+    if settings.init_schema:
+        await run_in_threadpool(schema.init_db, database.get_engine())
+    yield
+    await database.dispose_engines()
 
 # Create FastAPI app
 app = FastAPI(
     title="Book Management API",
     description="API for managing books with SQLAlchemy and SQLite",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# Per-route latency, SQL and serialization metrics (GET /metrics, Server-Timing)
+app.add_middleware(metrics.MetricsMiddleware)
+database.on_engine_created(metrics.instrument_engine)
+metrics.instrument_model(models.Book)
+metrics.register_collector(response_cache.metric_samples)
+metrics.register_collector(search_flights.metric_samples)
+
+# Routes for the book CRUD and search endpoints, served by async_routes
+# instead when DB_MODE=async
+router = APIRouter()
 
 @app.get("/")
 def read_root():
@@ -25,40 +65,83 @@ def read_root():
         "endpoints": {
             "GET /books": "Get all books",
             "GET /books/{id}": "Get a specific book",
+            "POST /books/batch-get": "Get many books by ID in one request",
+            "GET /books/search/": "Search books by title, author or year",
+            "POST /books/search/rebuild": "Rebuild the full-text search index",
+            "GET /books/export": "Stream the whole catalog as NDJSON or CSV",
+            "GET /books/stats": "Total number of books",
+            "GET /books/stats/by-author": "Number of books per author",
+            "GET /books/stats/by-year": "Number of books per publication year",
             "POST /books": "Create a new book",
+            "POST /books/bulk": "Create many books from a JSON array or NDJSON",
             "PUT /books/{id}": "Update a book",
-            "DELETE /books/{id}": "Delete a book"
+            "DELETE /books/{id}": "Delete a book",
+            "GET /cache/stats": "Response cache hit/miss counters and coalesced searches",
+            "GET /metrics": "Request, SQL and cache metrics in Prometheus format"
         }
     }
 
-@app.get("/books", response_model=List[schemas.BookResponse])
+@router.get("/books", response_model=List[schemas.BookResponse])
 def get_all_books(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     author: Optional[str] = None,
-    year: Optional[int] = None
+    year: Optional[int] = None,
+    after: Optional[str] = None,
+    sort: pagination.SortField = "id",
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get all books with optional filters"""
-    query = db.query(models.Book)
+    """
+    Get all books with optional filters.
     
-    if author:
-        query = query.filter(models.Book.author.ilike(f"%{author}%"))
+    Pages can be requested with skip/limit, or by passing the
+    X-Next-Cursor header of the previous response as `after`.
+    Responses carry an ETag that changes whenever any book changes.
+    """
+    key = cache.search_key(
+        "books", skip=skip, limit=limit, author=author, year=year, after=after, sort=sort
+    )
+    cached = response_cache.get(cache.SEARCH, key)
+    if cached is not None:
+        return versioning.respond(cached, if_none_match)
+    
+    generation = response_cache.generation
+    etag = versioning.list_etag(db.scalar(versioning.table_version_query), key)
+    if versioning.matches(if_none_match, etag):
+        return versioning.not_modified(etag)
+    
+    query = db.query(*serialization.BOOK_COLUMNS)
+    
+    query = search_index.apply_text_filters(query, db.get_bind(), author=author)
     
     if year:
         query = query.filter(models.Book.year == year)
     
+    query = pagination.apply_keyset(query, sort, after)
+    
     books = query.offset(skip).limit(limit).all()
-    return books
+    
+    headers = pagination.next_cursor_headers(books, sort, limit)
+    if etag:
+        headers["ETag"] = etag
+    
+    payload = cache.books_payload(books, headers)
+    response_cache.set(cache.SEARCH, key, payload, generation)
+    return payload.to_response()
 
-@app.get("/books/search/", response_model=List[schemas.BookResponse])
+@router.get("/books/search/", response_model=List[schemas.BookResponse])
 def search_books(
     db: Session = Depends(get_db),
     title: Optional[str] = None,
     author: Optional[str] = None,
     year: Optional[int] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    ranked: bool = False,
+    after: Optional[str] = None,
+    sort: pagination.SortField = "id",
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Search books by title, author, or year.
@@ -69,31 +152,153 @@ def search_books(
     - year: Search for books published in specific year
     - skip: Number of records to skip (for pagination)
     - limit: Maximum number of records to return
+    - ranked: Order results by relevance of the title/author match
+    - after: Cursor from the X-Next-Cursor header of the previous page
+    - sort: Column to order unranked results by (id, title or author)
     
     Returns:
     - List of books matching the search criteria
     """
-    query = db.query(models.Book)
+    if ranked and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for ranked search"
+        )
     
-    # Apply filters if provided
-    if title:
-        query = query.filter(models.Book.title.ilike(f"%{title}%"))
+    key = cache.search_key(
+        "search", title=title, author=author, year=year, skip=skip, limit=limit,
+        ranked=ranked, after=after, sort=sort
+    )
+    cached = response_cache.get(cache.SEARCH, key)
+    if cached is not None:
+        return versioning.respond(cached, if_none_match)
     
-    if author:
-        query = query.filter(models.Book.author.ilike(f"%{author}%"))
+    generation = response_cache.generation
+    etag = versioning.list_etag(db.scalar(versioning.table_version_query), key)
+    if versioning.matches(if_none_match, etag):
+        return versioning.not_modified(etag)
     
-    if year:
-        query = query.filter(models.Book.year == year)
+    def load():
+        query = db.query(*serialization.BOOK_COLUMNS)
+        
+        # Apply filters if provided
+        query = search_index.apply_text_filters(
+            query, db.get_bind(), title=title, author=author, ranked=ranked
+        )
+        
+        if year:
+            query = query.filter(models.Book.year == year)
+        
+        # Apply pagination
+        if not ranked:
+            query = pagination.apply_keyset(query, sort, after)
+        
+        books = query.offset(skip).limit(limit).all()
+        
+        headers = {} if ranked else pagination.next_cursor_headers(books, sort, limit)
+        if etag:
+            headers["ETag"] = etag
+        
+        payload = cache.books_payload(books, headers)
+        response_cache.set(cache.SEARCH, key, payload, generation)
+        return payload
     
-    # Apply pagination
-    books = query.offset(skip).limit(limit).all()
+    # Identical searches running right now share one query and its payload;
+    # the ETag (table version) in the key keeps them on the same catalog
+    payload = search_flights.do((key, generation, etag), load)
+    return versioning.respond(payload, if_none_match)
+
+@app.post("/books/search/rebuild")
+def rebuild_search_index(db: Session = Depends(get_db)):
+    """Rebuild the full-text search index from the books table"""
+    if not search_index.is_supported(db.get_bind()):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Full-text search index is only available for SQLite databases"
+        )
+    
+    search_index.rebuild_search_index(db.connection())
+    db.commit()
     
-    return books
+    return {"message": "Search index rebuilt"}
 
-@app.get("/books/{book_id}", response_model=schemas.BookResponse)
-def get_book(book_id: int, db: Session = Depends(get_db)):
-    """Get a specific book by ID"""
-    book = db.query(models.Book).filter(models.Book.id == book_id).first()
+@app.get("/books/export")
+def export_books(
+    format: export.ExportFormat = "ndjson",
+    author: Optional[str] = None,
+    year: Optional[int] = None
+):
+    """
+    Stream all books (optionally filtered) as NDJSON or CSV.
+    
+    Rows are read from the database in batches and sent while the export
+    is running, so any catalog size can be exported in constant memory.
+    """
+    return StreamingResponse(
+        export.export_books(format, author=author, year=year),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="books.{format}"'}
+    )
+
+# Registered on the app, before /books/{book_id}, so "stats" isn't taken for an ID
+@app.get("/books/stats", response_model=schemas.CatalogStats)
+def get_catalog_stats(db: Session = Depends(get_db)):
+    """Total number of books, read from a precomputed counter"""
+    return {"total": db.scalar(stats.total_query(db.get_bind()))}
+
+@app.get("/books/stats/by-author", response_model=List[schemas.AuthorCount])
+def get_stats_by_author(
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100
+):
+    """Number of books per author, most books first"""
+    rows = db.execute(stats.by_author_query(db.get_bind(), skip=skip, limit=limit))
+    return [{"author": author, "count": count} for author, count in rows]
+
+@app.get("/books/stats/by-year", response_model=List[schemas.YearCount])
+def get_stats_by_year(
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100
+):
+    """Number of books per publication year, books without a year first"""
+    rows = db.execute(stats.by_year_query(db.get_bind(), skip=skip, limit=limit))
+    return [
+        {"year": None if year == stats.UNKNOWN_YEAR else year, "count": count}
+        for year, count in rows
+    ]
+
+@router.get("/books/{book_id}", response_model=schemas.BookResponse)
+def get_book(
+    book_id: int,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get a specific book by ID.
+    
+    Returns 304 Not Modified if If-None-Match has the book's current ETag.
+    """
+    cached = response_cache.get(cache.BOOK, book_id)
+    if cached is not None:
+        return versioning.respond(cached, if_none_match)
+    
+    generation = response_cache.generation
+    
+    # Revalidation only needs the version, not the whole row
+    if if_none_match:
+        version = db.scalar(
+            select(models.Book.version).where(models.Book.id == book_id)
+        )
+        etag = versioning.book_etag(book_id, version)
+        if version is not None and versioning.matches(if_none_match, etag):
+            return versioning.not_modified(etag)
+    
+    book = db.execute(
+        select(*serialization.BOOK_COLUMNS, models.Book.version)
+        .where(models.Book.id == book_id)
+    ).first()
     
     if not book:
         raise HTTPException(
@@ -101,24 +306,30 @@ def get_book(book_id: int, db: Session = Depends(get_db)):
             detail=f"Book with ID {book_id} not found"
         )
     
-    return book
+    payload = cache.book_payload(book, {"ETag": versioning.book_etag(book.id, book.version)})
+    response_cache.set(cache.BOOK, book_id, payload, generation)
+    return payload.to_response()
 
-@app.post("/books", response_model=schemas.BookResponse, status_code=status.HTTP_201_CREATED)
-def create_book(book_data: schemas.BookCreate, db: Session = Depends(get_db)):
-    """Create a new book"""
-    # Check if book already exists
-    existing_book = db.query(models.Book).filter(
-        models.Book.title == book_data.title,
-        models.Book.author == book_data.author
-    ).first()
+@router.post("/books/batch-get", response_model=schemas.BatchGetResponse)
+def batch_get_books(request: schemas.BatchGetRequest, db: Session = Depends(get_db)):
+    """
+    Get many books by ID with one IN query per chunk of IDs.
     
-    if existing_book:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Book with this title and author already exists"
-        )
+    Books are returned in the order of the requested IDs (repeated IDs
+    once), IDs that don't exist are listed in "missing".
+    """
+    ids = batch.unique_ids(request.ids)
+    rows = [
+        row
+        for chunk in batch.id_chunks(ids)
+        for row in db.execute(batch.select_books(chunk))
+    ]
     
-    # Create new book
+    return Response(content=batch.batch_json(ids, rows), media_type="application/json")
+
+@router.post("/books", response_model=schemas.BookResponse, status_code=status.HTTP_201_CREATED)
+def create_book(response: Response, book_data: schemas.BookCreate, db: Session = Depends(get_db)):
+    """Create a new book"""
     new_book = models.Book(
         title=book_data.title,
         author=book_data.author,
@@ -126,14 +337,76 @@ def create_book(book_data: schemas.BookCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_book)
-    db.commit()
+    
+    # The unique (title, author) index rejects duplicates
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Book with this title and author already exists"
+        )
+    
+    response_cache.invalidate()
     db.refresh(new_book)
+    response.headers["ETag"] = versioning.book_etag(new_book.id, new_book.version)
     
     return new_book
 
-@app.put("/books/{book_id}", response_model=schemas.BookResponse)
-def update_book(book_id: int, book_data: schemas.BookUpdate, db: Session = Depends(get_db)):
-    """Update an existing book"""
+@app.post("/books/bulk", response_model=schemas.BulkCreateResponse)
+async def create_books_bulk(
+    request: Request,
+    db: Session = Depends(get_db),
+    chunk_size: int = Query(bulk.DEFAULT_CHUNK_SIZE, ge=1, le=bulk.MAX_CHUNK_SIZE),
+    on_conflict: bulk.ConflictAction = "skip"
+):
+    """
+    Create many books in one request.
+    
+    The body is a JSON array of books, or NDJSON (one book per line) when
+    sent with Content-Type: application/x-ndjson. Books are inserted and
+    committed in chunks of `chunk_size`. Existing books (same title and
+    author) are skipped, or get their year updated with on_conflict=update
+    (items without a year leave the book unchanged).
+    
+    Returns a result for every item, in request order.
+    """
+    body = await request.body()
+    
+    try:
+        items = bulk.parse_payload(body, request.headers.get("content-type", ""))
+    except bulk.BulkPayloadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        result = await run_in_threadpool(bulk.create_books, db, items, chunk_size, on_conflict)
+    except Exception:
+        # Chunks committed before the failure may have updated any book
+        response_cache.invalidate_all()
+        raise
+    
+    # Books updated with on_conflict=update must not keep their cached body and ETag
+    response_cache.invalidate(*(item.id for item in result.results if item.status == "updated"))
+    return result
+
+@router.put("/books/{book_id}", response_model=schemas.BookResponse)
+def update_book(
+    book_id: int,
+    book_data: schemas.BookUpdate,
+    response: Response,
+    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Update an existing book.
+    
+    With If-Match, the update only happens if the book still has that ETag
+    (412 Precondition Failed otherwise).
+    """
     book = db.query(models.Book).filter(models.Book.id == book_id).first()
     
     if not book:
@@ -142,6 +415,8 @@ def update_book(book_id: int, book_data: schemas.BookUpdate, db: Session = Depen
             detail=f"Book with ID {book_id} not found"
         )
     
+    versioning.check_if_match(if_match, book)
+    
     # Update fields if provided
     if book_data.title is not None:
         book.title = book_data.title
@@ -152,14 +427,35 @@ def update_book(book_id: int, book_data: schemas.BookUpdate, db: Session = Depen
     if book_data.year is not None:
         book.year = book_data.year
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Book with this title and author already exists"
+        )
+    except StaleDataError:
+        # Another request changed the book between our read and write
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Book with ID {book_id} has been modified"
+        )
+    
+    response_cache.invalidate(book_id)
     db.refresh(book)
+    response.headers["ETag"] = versioning.book_etag(book.id, book.version)
     
     return book
 
-@app.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_book(book_id: int, db: Session = Depends(get_db)):
-    """Delete a book"""
+@router.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_book(
+    book_id: int,
+    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None)
+):
+    """Delete a book, optionally only if it still matches the If-Match ETag"""
     book = db.query(models.Book).filter(models.Book.id == book_id).first()
     
     if not book:
@@ -168,10 +464,42 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
             detail=f"Book with ID {book_id} not found"
         )
     
+    versioning.check_if_match(if_match, book)
+    
     db.delete(book)
-    db.commit()
+    
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Book with ID {book_id} has been modified"
+        )
+    
+    response_cache.invalidate(book_id)
     
     return None
 
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Hit/miss counters and size of the response cache, and coalesced searches"""
+    return {**response_cache.stats(), "single_flight": search_flights.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics of this process"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# The async routes (and the async driver they need) are only imported in async mode
+if DB_MODE == "async":
+    import async_routes
+    app.include_router(async_routes.router)
+else:
+    app.include_router(router)
+
+# Development server with auto-reload, use serve.py in production
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
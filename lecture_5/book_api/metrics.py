@@ -0,0 +1,297 @@
+"""
+Per-request instrumentation of the Book API.
+
+MetricsMiddleware times every request and keeps a RequestStats object in
+a context variable for its duration. SQLAlchemy cursor events add the
+number of statements and the time spent in SQL, ORM load events and the
+serializer add the rows returned and the serialization time.
+
+Every response gets a Server-Timing header with the breakdown, and the
+aggregated per-route histograms are served in the Prometheus text format
+by GET /metrics. Metrics are kept per process: with several workers each
+one reports its own.
+
+Statements slower than SLOW_QUERY_MS are logged to the
+"book_api.slow_query" logger together with their parameters.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+slow_query_logger = logging.getLogger("book_api.slow_query")
+
+
+class RequestStats:
+    """Counters of a single request, filled in by the hooks below"""
+
+    __slots__ = ("queries", "sql_seconds", "rows", "serialize_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.serialize_seconds = 0.0
+
+    def server_timing(self, total_seconds):
+        """Value of the Server-Timing header, durations in milliseconds"""
+        return ", ".join((
+            f'db;dur={self.sql_seconds * 1000:.3f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize_seconds * 1000:.3f};desc="{self.rows} rows"',
+            f"total;dur={total_seconds * 1000:.3f}",
+        ))
+
+
+_current_stats = ContextVar("book_api_request_stats", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._series.items())
+
+        for labels, (counts, total, count) in series:
+            label_text = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+REQUESTS = Counter(
+    "book_api_requests_total", "Requests served", ("method", "route", "status")
+)
+REQUEST_DURATION = Histogram(
+    "book_api_request_duration_seconds", "Request latency", ROUTE_LABELS, LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "book_api_request_queries", "SQL statements executed per request", ROUTE_LABELS, QUERY_BUCKETS
+)
+REQUEST_SQL_DURATION = Histogram(
+    "book_api_request_sql_duration_seconds", "Time spent in SQL per request", ROUTE_LABELS, LATENCY_BUCKETS
+)
+REQUEST_SERIALIZE_DURATION = Histogram(
+    "book_api_request_serialize_duration_seconds", "Time spent serializing rows per request",
+    ROUTE_LABELS, LATENCY_BUCKETS
+)
+REQUEST_ROWS = Histogram(
+    "book_api_request_rows", "Rows loaded or serialized per request", ROUTE_LABELS, ROW_BUCKETS
+)
+
+METRICS = (
+    REQUESTS, REQUEST_DURATION, REQUEST_QUERIES,
+    REQUEST_SQL_DURATION, REQUEST_SERIALIZE_DURATION, REQUEST_ROWS,
+)
+
+_collectors = []
+
+
+def register_collector(collector):
+    """
+    Add extra samples to every scrape.
+
+    Args:
+        collector: Callable returning (name, type, help, value) tuples
+    """
+    _collectors.append(collector)
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    for collector in _collectors:
+        for name, metric_type, documentation, value in collector():
+            lines.extend((f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}", f"{name} {value}"))
+
+    return "\n".join(lines) + "\n"
+
+
+_route_paths = {}
+
+
+def route_label(scope):
+    """Path template of the route that served the request, e.g. /books/{book_id}"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+
+    path = _route_paths.get(endpoint)
+    if path is None:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                break
+        else:
+            path = getattr(endpoint, "__name__", "unknown")
+        _route_paths[endpoint] = path
+    return path
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route metrics and adding Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            elapsed = time.perf_counter() - started
+
+            labels = (scope["method"], route_label(scope))
+            REQUESTS.inc(labels + (str(status_code),))
+            REQUEST_DURATION.observe(labels, elapsed)
+            REQUEST_QUERIES.observe(labels, stats.queries)
+            REQUEST_SQL_DURATION.observe(labels, stats.sql_seconds)
+            REQUEST_SERIALIZE_DURATION.observe(labels, stats.serialize_seconds)
+            REQUEST_ROWS.observe(labels, stats.rows)
+
+
+@contextmanager
+def serializing(rows):
+    """Time the serialization of `rows` rows for the current request"""
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_seconds += time.perf_counter() - started
+        stats.rows += rows
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+
+    if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+        slow_query_logger.warning(
+            "Slow query (%.1f ms): %s; parameters: %r", elapsed * 1000, statement, parameters
+        )
+
+
+def instrument_engine(sync_engine):
+    """Count statements and SQL time of a (sync) engine, see database.on_engine_created"""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _on_load(target, context):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def instrument_model(model):
+    """Count ORM entities of a model loaded from the database as returned rows"""
+    event.listen(model, "load", _on_load)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, Table
 from database import Base
 
 class Book(Base):
@@ -10,13 +10,28 @@ class Book(Base):
         title (str): Book title (required)
         author (str): Book author (required)
         year (int): Publication year (optional)
+        version (int): Row version, incremented on every update
+    
+    The (title, author) pair is unique. The composite index also serves
+    lookups by title alone, so title has no index of its own.
+    
+    IDs are never reused (AUTOINCREMENT on SQLite), so the ETag of a new
+    book can't be that of a deleted one.
     """
     __tablename__ = "books"
+    __table_args__ = (
+        Index("uq_books_title_author", "title", "author", unique=True),
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), nullable=False, index=True)
+    title = Column(String(200), nullable=False)
     author = Column(String(100), nullable=False, index=True)
     year = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    # The ORM bumps `version` on UPDATE and checks it in the WHERE clause
+    __mapper_args__ = {"version_id_col": version}
     
     def __repr__(self):
         return f"<Book(id={self.id}, title='{self.title}', author='{self.author}', year={self.year})>"
@@ -28,4 +43,33 @@ class Book(Base):
             "title": self.title,
             "author": self.author,
             "year": self.year
-        }
\ No newline at end of file
+        }
+
+# Key/value counters about the catalog, maintained by database triggers
+# (e.g. "books_version", bumped on every change of the books table, and
+# "books_count", the number of books)
+catalog_meta = Table(
+    "catalog_meta",
+    Base.metadata,
+    Column("key", String(50), primary_key=True),
+    Column("value", Integer, nullable=False, default=0)
+)
+
+
+# Number of books per author and per publication year, maintained by
+# database triggers (see stats.py). Books without a year are counted
+# under year 0.
+author_stats = Table(
+    "author_stats",
+    Base.metadata,
+    Column("author", String(100), primary_key=True),
+    Column("book_count", Integer, nullable=False, default=0),
+    Index("ix_author_stats_book_count", "book_count")
+)
+
+year_stats = Table(
+    "year_stats",
+    Base.metadata,
+    Column("year", Integer, primary_key=True, autoincrement=False),
+    Column("book_count", Integer, nullable=False, default=0)
+)
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Keyset (cursor) pagination for book list endpoints.
+
+Instead of OFFSET, which makes the database walk over every skipped row,
+the next page is requested with an opaque cursor holding the sort key and
+id of the last book on the previous page.
+"""
+
+import base64
+import binascii
+import json
+from typing import Literal, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+import models
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SortField = Literal["id", "title", "author"]
+
+# Type of the sort value a cursor carries for each sort column
+SORT_VALUE_TYPES = {"id": int, "title": str, "author": str}
+
+
+def encode_cursor(sort, value, book_id):
+    """Encode the position after a book into an opaque cursor string"""
+    raw = json.dumps([sort, value, book_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor created by encode_cursor().
+
+    Returns:
+        tuple: (sort, value, book_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, value, book_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Malformed cursor")
+
+    # The value goes into the keyset predicate, so it must have the sort
+    # column's type (bool is excluded, it is an int subclass)
+    value_type = SORT_VALUE_TYPES.get(sort) if isinstance(sort, str) else None
+    if value_type is None or type(value) is not value_type or type(book_id) is not int:
+        raise ValueError("Malformed cursor")
+
+    return sort, value, book_id
+
+
+def apply_keyset(query, sort: SortField = "id", after: Optional[str] = None):
+    """
+    Order a books query by the sort column and continue after a cursor.
+
+    Works with both `Session.query()` and `select()` statements.
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid or was issued for another sort
+    """
+    sort_column = getattr(models.Book, sort)
+
+    if after:
+        try:
+            cursor_sort, value, book_id = decode_cursor(after)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+        if cursor_sort != sort:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cursor was issued for sort '{cursor_sort}', not '{sort}'"
+            )
+
+        if sort == "id":
+            query = query.filter(models.Book.id > book_id)
+        else:
+            query = query.filter(tuple_(sort_column, models.Book.id) > tuple_(value, book_id))
+
+    if sort == "id":
+        return query.order_by(models.Book.id)
+
+    return query.order_by(sort_column, models.Book.id)
+
+
+def next_cursor_headers(books, sort: SortField, limit: int):
+    """
+    Response headers with the cursor for the following page.
+
+    No cursor is sent when the page is not full, i.e. it is the last one.
+    """
+    if not books or len(books) < limit:
+        return {}
+
+    last = books[-1]
+    return {NEXT_CURSOR_HEADER: encode_cursor(sort, getattr(last, sort), last.id)}
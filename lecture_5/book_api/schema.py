@@ -0,0 +1,125 @@
+"""
+Schema setup of the Book API database.
+
+init_db() creates the tables, indexes, full-text search index, version
+triggers and catalog stats. It is idempotent, and is run once per deployment: by serve.py
+before the workers are started, or by the app itself when INIT_SCHEMA is
+on (the default, for single-process runs).
+"""
+
+from sqlalchemy import MetaData, func, inspect, select, text, tuple_
+from sqlalchemy.schema import CreateTable
+
+import models
+import search_index
+import stats
+import versioning
+
+# Indexes of earlier versions, dropped on upgrade: the single-column title
+# index is covered by the unique (title, author) index
+OBSOLETE_INDEXES = ("ix_books_title",)
+
+# Name of the books table while it is rebuilt by ensure_autoincrement()
+REBUILD_TABLE = "books_rebuild"
+
+# Duplicate books listed by DuplicateBooksError
+MAX_REPORTED_DUPLICATES = 20
+
+
+class DuplicateBooksError(RuntimeError):
+    """Raised when existing books prevent creating the unique (title, author) index"""
+
+
+def check_unique_books(engine):
+    """
+    Make sure the unique (title, author) index can be created.
+
+    Databases from before the index may have several books with the same
+    title and author. They aren't merged automatically, which book to keep
+    is for an operator to decide.
+
+    Raises:
+        DuplicateBooksError: Naming the duplicate books, if there are any
+    """
+    book = models.Book
+    with engine.connect() as conn:
+        indexes = {index["name"] for index in inspect(conn).get_indexes("books")}
+        if "uq_books_title_author" in indexes:
+            return
+
+        duplicates = (
+            select(book.title, book.author)
+            .group_by(book.title, book.author)
+            .having(func.count() > 1)
+        )
+        rows = conn.execute(
+            select(book.id, book.title, book.author)
+            .where(tuple_(book.title, book.author).in_(duplicates))
+            .order_by(book.title, book.author, book.id)
+            .limit(MAX_REPORTED_DUPLICATES)
+        ).all()
+
+    if rows:
+        listed = "; ".join(f"id={row.id} {row.title!r} by {row.author!r}" for row in rows)
+        raise DuplicateBooksError(
+            "Can't create the unique (title, author) index: books with the same title "
+            f"and author exist ({listed}{'; ...' if len(rows) == MAX_REPORTED_DUPLICATES else ''}). "
+            "Delete or rename the duplicates and start again."
+        )
+
+
+def ensure_autoincrement(engine):
+    """
+    Rebuild a SQLite books table created without AUTOINCREMENT.
+
+    Without it SQLite gives the highest ID to a new book again after that
+    book is deleted, and the new book's ETag can equal the deleted one's.
+    The rows are copied with their IDs into a new table; the indexes and
+    triggers dropped with the old one are created again by init_db.
+    """
+    # Other databases' sequences never hand out an ID twice
+    if engine.dialect.name != "sqlite":
+        return
+
+    books = models.Book.__table__
+    with engine.begin() as conn:
+        sql = conn.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'books'"))
+        if "AUTOINCREMENT" in sql.upper():
+            return
+
+        existing = {column["name"] for column in inspect(conn).get_columns("books")}
+        columns = ", ".join(column.name for column in books.columns if column.name in existing)
+
+        conn.execute(text(f"DROP TABLE IF EXISTS {REBUILD_TABLE}"))
+        conn.execute(CreateTable(books.to_metadata(MetaData(), name=REBUILD_TABLE)))
+        conn.execute(text(f"INSERT INTO {REBUILD_TABLE} ({columns}) SELECT {columns} FROM books"))
+        conn.execute(text("DROP TABLE books"))
+        conn.execute(text(f"ALTER TABLE {REBUILD_TABLE} RENAME TO books"))
+
+
+def init_db(engine):
+    """Create or upgrade everything the API needs in the database"""
+    models.Base.metadata.create_all(bind=engine)
+
+    # Stop SQLite from reusing the IDs of deleted books
+    ensure_autoincrement(engine)
+
+    # Add indexes introduced after the table was first created, which
+    # for the unique (title, author) index needs the books to be unique
+    check_unique_books(engine)
+    for index in models.Book.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    # Drop the indexes they replace
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    # Create the full-text search index for /books/search/
+    search_index.ensure_search_index(engine)
+
+    # Add row/table versions used for ETags
+    versioning.ensure_versioning(engine)
+
+    # Keep per-author/per-year counts for /books/stats
+    stats.ensure_stats(engine)
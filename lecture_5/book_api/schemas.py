@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 
 # Base schema for Book
 class BookBase(BaseModel):
@@ -22,4 +22,44 @@ class BookResponse(BookBase):
     id: int
     
     class Config:
-        from_attributes = True  # Allows ORM mode (formerly orm_mode)
\ No newline at end of file
+        from_attributes = True  # Allows ORM mode (formerly orm_mode)
+
+# Result of one item of a bulk create request
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    status: Literal["created", "updated", "duplicate", "invalid"]
+    id: Optional[int] = Field(None, description="ID of the created or existing book")
+    detail: Optional[str] = None
+
+# Schema for bulk create response
+class BulkCreateResponse(BaseModel):
+    created: int
+    updated: int
+    duplicates: int
+    invalid: int
+    results: List[BulkItemResult]
+
+
+# Most IDs accepted by one batch-get request
+MAX_BATCH_GET_IDS = 1000
+
+# Schema for fetching many books by ID
+class BatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_GET_IDS, description="Book IDs to fetch")
+
+# Schema for batch-get response
+class BatchGetResponse(BaseModel):
+    books: List[BookResponse] = Field(..., description="Found books, in request order")
+    missing: List[int] = Field(..., description="Requested IDs that don't exist")
+
+# Schemas for the catalog statistics
+class CatalogStats(BaseModel):
+    total: int = Field(..., description="Number of books in the catalog")
+
+class AuthorCount(BaseModel):
+    author: str
+    count: int
+
+class YearCount(BaseModel):
+    year: Optional[int] = Field(..., description="Publication year, null for books without one")
+    count: int
\ No newline at end of file
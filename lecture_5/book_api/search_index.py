@@ -0,0 +1,130 @@
+"""
+Full-text search index for the books table.
+
+The index is an SQLite FTS5 virtual table using the trigram tokenizer, so
+substring searches on title and author are answered from the index instead
+of a full scan with ILIKE '%term%'. Triggers keep it in sync with `books`.
+"""
+
+from sqlalchemy import column, inspect, literal_column, select, table, text
+import models
+
+FTS_TABLE = "books_fts"
+
+# The trigram tokenizer can only match terms of at least three characters,
+# shorter terms fall back to a plain ILIKE filter.
+MIN_TERM_LENGTH = 3
+
+SEARCH_INDEX_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, author,
+        content='books', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, author ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO {FTS_TABLE}(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+]
+
+books_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+
+def is_supported(bind):
+    """Check if the database behind an engine or connection supports the index"""
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(engine):
+    """
+    Create the search index and its triggers if they don't exist yet.
+
+    When the index is created for an existing database it is filled
+    from the current contents of the books table.
+
+    Returns:
+        bool: True if the index is available
+    """
+    if not is_supported(engine):
+        return False
+
+    with engine.begin() as conn:
+        created = not inspect(conn).has_table(FTS_TABLE)
+        for statement in SEARCH_INDEX_DDL:
+            conn.execute(text(statement))
+        if created:
+            rebuild_search_index(conn)
+
+    return True
+
+
+def rebuild_search_index(conn):
+    """Rebuild the whole search index from the books table"""
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _match_phrase(column_name, term):
+    """Build an FTS5 column filter matching the term as a substring"""
+    escaped = term.replace('"', '""')
+    return f'{column_name} : "{escaped}"'
+
+
+def apply_text_filters(query, bind, title=None, author=None, ranked=False):
+    """
+    Filter a books query by substrings of title and author.
+
+    Works with both `Session.query()` and `select()` statements. Terms are
+    looked up in the search index when it is available, otherwise (or for
+    terms too short for trigrams) a case-insensitive LIKE is used.
+
+    Args:
+        query: Query or Select over models.Book
+        bind: Engine or connection the query will run on
+        title (str): Text the title should contain
+        author (str): Text the author name should contain
+        ranked (bool): Order results by relevance (best match first); by
+            id when no term is matched through the index, so pages stay stable
+    """
+    use_index = is_supported(bind)
+    phrases = []
+
+    for column_name, value in (("title", title), ("author", author)):
+        if not value:
+            continue
+        if use_index and len(value) >= MIN_TERM_LENGTH:
+            phrases.append(_match_phrase(column_name, value))
+        else:
+            book_column = getattr(models.Book, column_name)
+            query = query.filter(book_column.ilike(f"%{value}%"))
+
+    if not phrases:
+        return query.order_by(models.Book.id) if ranked else query
+
+    match = literal_column(FTS_TABLE).match(" AND ".join(phrases))
+
+    if ranked:
+        return (
+            query.join(books_fts, books_fts.c.rowid == models.Book.id)
+            .filter(match)
+            .order_by(books_fts.c.rank)
+        )
+
+    return query.filter(models.Book.id.in_(select(books_fts.c.rowid).where(match)))
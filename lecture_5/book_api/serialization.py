@@ -0,0 +1,47 @@
+"""
+Fast JSON serialization of book rows for the read endpoints.
+
+Read endpoints select plain column tuples instead of hydrating Book
+entities, and encode them straight to JSON with orjson (stdlib json when
+orjson isn't installed), skipping Pydantic validation of every row. The
+output has the same shape and field order as schemas.BookResponse.
+"""
+
+import json
+
+import metrics
+import models
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Selected columns, in the field order of schemas.BookResponse
+BOOK_COLUMNS = (models.Book.title, models.Book.author, models.Book.year, models.Book.id)
+
+FIELD_NAMES = tuple(column.key for column in BOOK_COLUMNS)
+
+
+def dumps(value):
+    """Encode a value to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def row_to_dict(row):
+    """Convert a row of BOOK_COLUMNS to a response dict"""
+    return dict(zip(FIELD_NAMES, row))
+
+
+def book_json(row):
+    """JSON body for one book row"""
+    with metrics.serializing(1):
+        return dumps(row_to_dict(row))
+
+
+def books_json(rows):
+    """JSON body for a list of book rows"""
+    with metrics.serializing(len(rows)):
+        return dumps([dict(zip(FIELD_NAMES, row)) for row in rows])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Production entry point of the Book API.
+
+Creates or upgrades the schema once in this process, closes its database
+connections, then starts uvicorn with one worker process per CPU. The
+workers import the app with INIT_SCHEMA=false so they don't repeat the
+schema setup. On SIGTERM/SIGINT uvicorn stops accepting connections and
+lets in-flight requests finish for up to --graceful-timeout seconds.
+
+The response cache lives in each worker's memory, and a write only
+clears the cache of the worker that handled it: the others would keep
+serving the old body and ETag (and 304s for it) for up to CACHE_TTL.
+So with more than one worker the cache is turned off (CACHE_BACKEND=none),
+and an explicit CACHE_BACKEND=memory is refused; run a single worker to
+use it.
+
+Usage:
+    python serve.py [--host 0.0.0.0] [--port 8000] [--workers N] [--graceful-timeout 30]
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+
+def default_workers():
+    """WEB_CONCURRENCY if set, otherwise the CPUs available to this process"""
+    if os.getenv("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the Book API with multiple workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--graceful-timeout", type=float, default=30,
+                        help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--skip-init-db", action="store_true",
+                        help="Don't create/upgrade the schema before starting")
+    return parser.parse_args()
+
+
+def init_schema():
+    """Run the schema setup once, before any worker is started"""
+    import schema
+    from database import get_engine
+
+    engine = get_engine()
+    schema.init_db(engine)
+    engine.dispose()
+
+
+def main():
+    args = parse_args()
+
+    # Per-process caches can't see each other's invalidations
+    if args.workers > 1:
+        if os.getenv("CACHE_BACKEND", "").strip().lower() == "memory":
+            raise SystemExit(
+                "CACHE_BACKEND=memory can't be used with more than one worker: "
+                "each worker would keep serving books changed through another one. "
+                "Use --workers 1 or CACHE_BACKEND=none."
+            )
+        os.environ["CACHE_BACKEND"] = "none"
+
+    if not args.skip_init_db:
+        init_schema()
+
+    # Inherited by the worker processes
+    os.environ["INIT_SCHEMA"] = "false"
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
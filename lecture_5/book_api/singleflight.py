@@ -0,0 +1,120 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many identical searches arrive at once, the first one (the leader)
+runs the query and serializes the result; the others wait for it and
+share the same serialized payload instead of each running the query.
+Only requests that overlap an in-flight call are coalesced, nothing is
+kept once it finishes, so this never serves a result older than the
+request that would have produced it. Callers include the response cache
+generation in the key, so a request arriving after a write never joins a
+flight that started before it.
+
+Sync routes (threadpool) use SingleFlight.do, async routes do_async.
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    """An in-flight call that followers wait on"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time, sharing its result with concurrent callers"""
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Call func(), or wait for the call already running for key.
+
+        Returns:
+            The result of func; an exception it raised is raised to every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    async def do_async(self, key, func):
+        """
+        Await func(), or the call already running for key on this event loop.
+
+        Returns:
+            The result of func; an exception it raised is raised to every caller
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            with self._lock:
+                self.coalesced += 1
+        else:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda done: self._forget_task(key, done))
+            with self._lock:
+                self.executions += 1
+
+        # Shielded, so one caller giving up doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _forget_task(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def in_flight(self):
+        return len(self._calls) + len(self._tasks)
+
+    def stats(self):
+        requests = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
+
+    def metric_samples(self):
+        """Samples for the /metrics endpoint (see metrics.register_collector)"""
+        return [
+            ("book_api_singleflight_executions_total", "counter",
+             "Coalescable reads that ran their query", self.executions),
+            ("book_api_singleflight_coalesced_total", "counter",
+             "Reads that shared the result of an identical in-flight query", self.coalesced),
+            ("book_api_singleflight_in_flight", "gauge", "Queries currently in flight", self.in_flight()),
+        ]
+
+
+search_flights = SingleFlight()
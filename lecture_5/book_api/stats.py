@@ -0,0 +1,155 @@
+"""
+Precomputed catalog statistics: total count and counts per author and year.
+
+On SQLite, triggers on the books table keep `author_stats`, `year_stats`
+and the "books_count" counter in `catalog_meta` up to date on every
+insert, update and delete, whichever code path makes the change (single
+or bulk endpoints, scripts). Reading the stats then never aggregates the
+books table. Other databases fall back to GROUP BY queries over books.
+"""
+
+from sqlalchemy import func, select, text
+import models
+
+BOOK_COUNT_KEY = "books_count"
+
+# Year under which books without a publication year are counted
+UNKNOWN_YEAR = 0
+
+_ADD_NEW = """
+        INSERT INTO author_stats (author, book_count) VALUES (new.author, 1)
+            ON CONFLICT (author) DO UPDATE SET book_count = book_count + 1;
+        INSERT INTO year_stats (year, book_count) VALUES (COALESCE(new.year, 0), 1)
+            ON CONFLICT (year) DO UPDATE SET book_count = book_count + 1;
+"""
+
+_REMOVE_OLD = """
+        UPDATE author_stats SET book_count = book_count - 1 WHERE author = old.author;
+        DELETE FROM author_stats WHERE author = old.author AND book_count <= 0;
+        UPDATE year_stats SET book_count = book_count - 1 WHERE year = COALESCE(old.year, 0);
+        DELETE FROM year_stats WHERE year = COALESCE(old.year, 0) AND book_count <= 0;
+"""
+
+STATS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_stats_insert AFTER INSERT ON books BEGIN
+        {_ADD_NEW}
+        UPDATE catalog_meta SET value = value + 1 WHERE key = '{BOOK_COUNT_KEY}';
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_stats_delete AFTER DELETE ON books BEGIN
+        {_REMOVE_OLD}
+        UPDATE catalog_meta SET value = value - 1 WHERE key = '{BOOK_COUNT_KEY}';
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_stats_update AFTER UPDATE OF author, year ON books
+    WHEN old.author IS NOT new.author OR old.year IS NOT new.year BEGIN
+        {_REMOVE_OLD}
+        {_ADD_NEW}
+    END
+    """,
+]
+
+
+def is_supported(bind):
+    """Check if the stats tables are maintained by triggers on this database"""
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_stats(engine):
+    """
+    Create the stats triggers if they don't exist yet.
+
+    When they are created for an existing database, the stats are filled
+    from the current contents of the books table in the same transaction.
+
+    Returns:
+        bool: True if the precomputed stats are available
+    """
+    if not is_supported(engine):
+        return False
+
+    with engine.begin() as conn:
+        created = conn.execute(text(
+            "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES (:key, 0)"
+        ), {"key": BOOK_COUNT_KEY}).rowcount == 1
+
+        for statement in STATS_TRIGGERS:
+            conn.execute(text(statement))
+        if created:
+            rebuild_stats(conn)
+
+    return True
+
+
+def rebuild_stats(conn):
+    """Recompute all stats from the books table"""
+    conn.execute(models.author_stats.delete())
+    conn.execute(models.year_stats.delete())
+
+    conn.execute(models.author_stats.insert().from_select(
+        ["author", "book_count"],
+        select(models.Book.author, func.count()).group_by(models.Book.author)
+    ))
+    year = func.coalesce(models.Book.year, UNKNOWN_YEAR)
+    conn.execute(models.year_stats.insert().from_select(
+        ["year", "book_count"],
+        select(year, func.count()).group_by(year)
+    ))
+
+    conn.execute(
+        models.catalog_meta.update()
+        .where(models.catalog_meta.c.key == BOOK_COUNT_KEY)
+        .values(value=select(func.count()).select_from(models.Book).scalar_subquery())
+    )
+
+
+def total_query(bind):
+    """Query returning the number of books"""
+    if is_supported(bind):
+        return (
+            select(models.catalog_meta.c.value)
+            .where(models.catalog_meta.c.key == BOOK_COUNT_KEY)
+        )
+    return select(func.count()).select_from(models.Book)
+
+
+def by_author_query(bind, skip=0, limit=100):
+    """Query returning (author, book_count) rows, most books first"""
+    if is_supported(bind):
+        counts = models.author_stats
+    else:
+        counts = (
+            select(models.Book.author, func.count().label("book_count"))
+            .group_by(models.Book.author)
+            .subquery()
+        )
+
+    return (
+        select(counts.c.author, counts.c.book_count)
+        .order_by(counts.c.book_count.desc(), counts.c.author)
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def by_year_query(bind, skip=0, limit=100):
+    """Query returning (year, book_count) rows by year, UNKNOWN_YEAR first"""
+    if is_supported(bind):
+        counts = models.year_stats
+    else:
+        year = func.coalesce(models.Book.year, UNKNOWN_YEAR)
+        counts = (
+            select(year.label("year"), func.count().label("book_count"))
+            .group_by(year)
+            .subquery()
+        )
+
+    return (
+        select(counts.c.year, counts.c.book_count)
+        .order_by(counts.c.year)
+        .offset(skip)
+        .limit(limit)
+    )
@@ -0,0 +1,41 @@
+"""
+Tests for fetching many books by ID (POST /books/batch-get)
+"""
+
+import batch
+import schemas
+
+MISSING_ID = 10 ** 9
+
+
+def test_books_are_returned_in_request_order(client, create_book):
+    dune = create_book("Dune")
+    emma = create_book("Emma")
+
+    response = client.post("/books/batch-get", json={"ids": [emma["id"], MISSING_ID, dune["id"], emma["id"]]})
+
+    assert response.status_code == 200
+    assert response.json() == {"books": [emma, dune], "missing": [MISSING_ID]}
+
+
+def test_ids_span_several_in_queries(client, create_book):
+    dune = create_book("Dune")
+    emma = create_book("Emma")
+    missing = list(range(MISSING_ID, MISSING_ID + batch.IN_CHUNK_SIZE))
+
+    response = client.post("/books/batch-get", json={"ids": [dune["id"], *missing, emma["id"]]})
+
+    assert [book["title"] for book in response.json()["books"]] == ["Dune", "Emma"]
+    assert response.json()["missing"] == missing
+
+
+def test_id_chunks():
+    assert batch.unique_ids([3, 1, 3, 2, 1]) == [3, 1, 2]
+    assert batch.id_chunks([1, 2, 3, 4, 5], size=2) == [[1, 2], [3, 4], [5]]
+
+
+def test_request_size_is_limited(client):
+    assert client.post("/books/batch-get", json={"ids": []}).status_code == 422
+
+    ids = list(range(1, schemas.MAX_BATCH_GET_IDS + 2))
+    assert client.post("/books/batch-get", json={"ids": ids}).status_code == 422
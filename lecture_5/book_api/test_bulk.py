@@ -0,0 +1,127 @@
+"""
+Tests for bulk book creation (POST /books/bulk)
+"""
+
+import json
+
+import pytest
+
+import bulk
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _items(response):
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_parse_json_array_and_ndjson():
+    books = [{"title": "Dune", "author": "Frank Herbert"}, {"title": "Emma", "author": "Jane Austen"}]
+    assert bulk.parse_payload(json.dumps(books).encode(), "application/json") == books
+
+    body = "\n".join(json.dumps(book) for book in books).encode() + b"\n\n"
+    assert bulk.parse_payload(body, "application/x-ndjson; charset=utf-8") == books
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (b'{"title": "Dune"}', "application/json"),
+    (b"[", "application/json"),
+    (b"\xff\xfe", "application/json"),
+    (b'{"title": "Caf\xe9", "author": "X"}\n', "application/x-ndjson"),
+])
+def test_parse_rejects_unusable_body(body, content_type):
+    with pytest.raises(bulk.BulkPayloadError):
+        bulk.parse_payload(body, content_type)
+
+
+def test_create_reports_every_item_in_order(client):
+    response = client.post("/books/bulk", json=[
+        {"title": "Dune", "author": "Frank Herbert", "year": 1965},
+        {"title": "Emma", "author": "Jane Austen"},
+        {"title": "Dune", "author": "Frank Herbert", "year": 1966},
+        {"title": "", "author": "Nobody"},
+        "not a book",
+    ])
+    result = _items(response)
+
+    assert (result["created"], result["updated"], result["duplicates"], result["invalid"]) == (2, 0, 1, 2)
+    assert [item["status"] for item in result["results"]] == [
+        "created", "created", "duplicate", "invalid", "invalid"
+    ]
+    assert [item["index"] for item in result["results"]] == [0, 1, 2, 3, 4]
+
+
+def test_existing_books_are_skipped_by_default(client, create_book):
+    existing = create_book("Dune", author="Frank Herbert", year=1965)
+
+    result = _items(client.post("/books/bulk", json=[
+        {"title": "Dune", "author": "Frank Herbert", "year": 1990},
+        {"title": "Emma", "author": "Jane Austen"},
+    ]))
+
+    assert [item["status"] for item in result["results"]] == ["duplicate", "created"]
+    assert result["results"][0]["id"] == existing["id"]
+    assert client.get(f"/books/{existing['id']}").json()["year"] == 1965
+
+
+def test_existing_books_are_updated_on_conflict_update(client, create_book):
+    existing = create_book("Dune", author="Frank Herbert", year=1965)
+
+    result = _items(client.post("/books/bulk", params={"on_conflict": "update"}, json=[
+        {"title": "Dune", "author": "Frank Herbert", "year": 1990},
+    ]))
+
+    assert result["updated"] == 1
+    assert result["results"][0] == {"index": 0, "status": "updated", "id": existing["id"], "detail": None}
+    assert client.get(f"/books/{existing['id']}").json()["year"] == 1990
+
+
+def test_update_without_a_year_keeps_the_book(client, create_book):
+    existing = create_book("Dune", author="Frank Herbert", year=1965)
+
+    result = _items(client.post("/books/bulk", params={"on_conflict": "update"}, json=[
+        {"title": "Dune", "author": "Frank Herbert"},
+    ]))
+
+    assert (result["updated"], result["duplicates"]) == (0, 1)
+    assert result["results"][0]["id"] == existing["id"]
+    assert client.get(f"/books/{existing['id']}").json() == existing
+
+
+def test_ndjson_with_a_malformed_line(client):
+    body = b'{"title": "Dune", "author": "Frank Herbert"}\n{not json\n{"title": "Emma", "author": "Jane Austen"}\n'
+
+    result = _items(client.post("/books/bulk", content=body, headers=NDJSON))
+
+    assert [item["status"] for item in result["results"]] == ["created", "invalid", "created"]
+
+
+def test_chunked_import_creates_each_book_once(client):
+    items = [{"title": f"Book {i % 3}", "author": "Author"} for i in range(7)]
+
+    result = _items(client.post("/books/bulk", params={"chunk_size": 2}, json=items))
+
+    assert (result["created"], result["duplicates"]) == (3, 4)
+    assert client.get("/books/stats").json()["total"] == 3
+
+
+@pytest.mark.parametrize("body, headers", [
+    (b'{"title": "Dune"}', {"Content-Type": "application/json"}),
+    (b'{"title": "Caf\xe9", "author": "X"}\n', NDJSON),
+])
+def test_unusable_body_is_a_bad_request(client, body, headers):
+    assert client.post("/books/bulk", content=body, headers=headers).status_code == 400
+
+
+def test_chunk_is_split_into_several_statements(client, create_book, monkeypatch):
+    monkeypatch.setattr(bulk, "LOOKUP_KEYS_PER_STATEMENT", 2)
+    monkeypatch.setattr(bulk, "INSERT_ROWS_PER_STATEMENT", 2)
+    existing = create_book("Book 3")
+
+    result = _items(client.post("/books/bulk", json=[{"title": f"Book {i}", "author": "Author"} for i in range(7)]))
+
+    assert [item["status"] for item in result["results"]] == ["created"] * 3 + ["duplicate"] + ["created"] * 3
+    assert result["results"][3]["id"] == existing["id"]
+    assert client.get("/books/stats").json()["total"] == 7
+
@@ -0,0 +1,106 @@
+"""
+Tests for the response cache and its invalidation
+"""
+
+import cache
+from cache import BOOK, SEARCH, MemoryCache, ResponseCache, search_key
+
+
+def test_set_is_dropped_after_an_invalidation():
+    responses = ResponseCache(MemoryCache())
+    generation = responses.generation
+
+    responses.invalidate(1)
+    responses.set(BOOK, 1, "stale", generation)
+    assert responses.get(BOOK, 1) is None
+
+    responses.set(BOOK, 1, "fresh", responses.generation)
+    assert responses.get(BOOK, 1) == "fresh"
+
+
+def test_invalidate_forgets_the_books_and_every_search():
+    responses = ResponseCache(MemoryCache())
+    generation = responses.generation
+    for namespace, key in ((BOOK, 1), (BOOK, 2), (SEARCH, "a"), (SEARCH, "b")):
+        responses.set(namespace, key, "cached", generation)
+
+    responses.invalidate(1)
+
+    assert responses.get(BOOK, 1) is None
+    assert responses.get(BOOK, 2) == "cached"
+    assert responses.get(SEARCH, "a") is None and responses.get(SEARCH, "b") is None
+
+
+def test_invalidate_all_forgets_every_book():
+    responses = ResponseCache(MemoryCache())
+    responses.set(BOOK, 1, "cached", responses.generation)
+
+    responses.invalidate_all()
+
+    assert responses.get(BOOK, 1) is None
+
+
+def test_memory_cache_expires_and_evicts():
+    backend = MemoryCache(ttl=-1)
+    backend.set(BOOK, 1, "cached")
+    assert backend.get(BOOK, 1) is None
+
+    backend = MemoryCache(max_entries=2)
+    for book_id in (1, 2, 3):
+        backend.set(BOOK, book_id, "cached")
+    assert backend.get(BOOK, 1) is None and len(backend) == 2
+
+
+def test_search_key_ignores_ascii_case_and_unset_parameters():
+    assert search_key("search", title="Dune", author=None, limit=10) == search_key("search", limit=10, title="dUNE")
+    assert search_key("search", title="dune ") != search_key("search", title="dune")
+
+
+def test_search_key_keeps_non_ascii_case():
+    # LIKE doesn't fold these, so they match different books
+    assert search_key("search", title="straße") != search_key("search", title="STRASSE")
+    assert search_key("search", title="é") != search_key("search", title="É")
+
+
+def test_update_is_visible_through_the_cache(client, create_book):
+    book = create_book("Dune", year=1965)
+    client.get(f"/books/{book['id']}")
+    client.get("/books/search/", params={"title": "dune"})
+
+    client.put(f"/books/{book['id']}", json={"year": 1966})
+
+    assert client.get(f"/books/{book['id']}").json()["year"] == 1966
+    assert [found["year"] for found in client.get("/books/search/", params={"title": "dune"}).json()] == [1966]
+
+
+def test_delete_is_visible_through_the_cache(client, create_book):
+    book = create_book("Dune")
+    client.get(f"/books/{book['id']}")
+
+    client.delete(f"/books/{book['id']}")
+
+    assert client.get(f"/books/{book['id']}").status_code == 404
+
+
+def test_bulk_update_invalidates_the_updated_books(client, create_book):
+    book = create_book("Dune", author="Frank Herbert", year=1965)
+    etag = client.get(f"/books/{book['id']}").headers["ETag"]
+
+    client.post("/books/bulk", params={"on_conflict": "update"}, json=[
+        {"title": "Dune", "author": "Frank Herbert", "year": 1990},
+    ])
+
+    response = client.get(f"/books/{book['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["year"] == 1990
+    assert response.headers["ETag"] != etag
+
+
+def test_repeated_reads_are_cache_hits(client, create_book):
+    book = create_book("Dune")
+    hits = cache.response_cache.hits
+
+    for _ in range(3):
+        client.get(f"/books/{book['id']}")
+
+    assert cache.response_cache.hits - hits == 2
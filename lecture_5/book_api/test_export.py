@@ -0,0 +1,59 @@
+"""
+Tests for the streaming catalog export (GET /books/export)
+"""
+
+import csv
+import io
+import json
+
+import export
+
+
+def test_ndjson_export(client, create_book):
+    dune = create_book("Dune", author="Frank Herbert", year=1965)
+    emma = create_book("Emma", author="Jane Austen", year=None)
+
+    response = client.get("/books/export")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="books.ndjson"'
+    assert [json.loads(line) for line in response.text.splitlines()] == [dune, emma]
+
+
+def test_csv_export(client, create_book):
+    create_book("Dune, Part One", author="Frank Herbert", year=1965)
+    create_book('Emma "Annotated"', author="Jane Austen", year=None)
+
+    response = client.get("/books/export", params={"format": "csv"})
+
+    assert response.headers["Content-Type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == list(export.EXPORT_COLUMNS)
+    assert [row[1:] for row in rows[1:]] == [
+        ["Dune, Part One", "Frank Herbert", "1965"],
+        ['Emma "Annotated"', "Jane Austen", ""],
+    ]
+
+
+def test_export_filters(client, create_book):
+    create_book("Dune", author="Frank Herbert", year=1965)
+    create_book("Children of Dune", author="Frank Herbert", year=1976)
+    create_book("Emma", author="Jane Austen", year=1815)
+
+    response = client.get("/books/export", params={"author": "herbert", "year": 1976})
+
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["Children of Dune"]
+
+
+def test_export_is_written_in_batches(client, create_book):
+    for i in range(5):
+        create_book(f"Book {i}")
+
+    chunks = list(export.iter_ndjson(export.iter_book_rows(batch_size=2)))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/books/export", params={"format": "xml"}).status_code == 422
@@ -0,0 +1,85 @@
+"""
+Tests for keyset (cursor) pagination
+"""
+
+import base64
+
+import pytest
+
+import pagination
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _raw_cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("sort, value, book_id", [
+    ("id", 42, 42),
+    ("title", "Dune", 7),
+    ("author", "Ursula K. Le Guin", 3),
+    ("title", "", 1),
+])
+def test_cursor_round_trip(sort, value, book_id):
+    assert decode_cursor(encode_cursor(sort, value, book_id)) == (sort, value, book_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    _raw_cursor("{}"),
+    _raw_cursor('["id", 1]'),
+    _raw_cursor('"id"'),
+    encode_cursor("year", 1990, 1),
+    encode_cursor("id", "5", 5),
+    encode_cursor("id", True, 5),
+    encode_cursor("title", 5, 5),
+    encode_cursor("title", ["Dune"], 5),
+    encode_cursor("author", None, 5),
+    encode_cursor("id", 5, "5"),
+    encode_cursor("id", 5, 5.0),
+])
+def test_decode_rejects_tampered_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_sort_value_types_cover_every_sort_field():
+    assert set(pagination.SORT_VALUE_TYPES) == set(pagination.SortField.__args__)
+
+
+@pytest.mark.parametrize("sort", ["id", "title", "author"])
+def test_cursor_pages_walk_every_book_once(client, create_book, sort):
+    books = [create_book(f"Book {i}", author=f"Author {i % 3}") for i in (4, 1, 3, 0, 2)]
+    expected = sorted(books, key=lambda book: (book[sort], book["id"]))
+
+    seen = []
+    params = {"sort": sort, "limit": 2}
+    while True:
+        response = client.get("/books", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        params["after"] = cursor
+
+    assert [book["id"] for book in seen] == [book["id"] for book in expected]
+
+
+@pytest.mark.parametrize("path", ["/books", "/books/search/"])
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    encode_cursor("title", 1, 1),
+    encode_cursor("title", "Dune", "1"),
+])
+def test_tampered_cursor_is_a_bad_request(client, create_book, path, cursor):
+    create_book("Dune")
+    response = client.get(path, params={"sort": "title", "after": cursor})
+    assert response.status_code == 400
+
+
+def test_cursor_for_another_sort_is_a_bad_request(client, create_book):
+    create_book("Dune")
+    response = client.get("/books", params={"sort": "author", "after": encode_cursor("title", "Dune", 1)})
+    assert response.status_code == 400
@@ -0,0 +1,62 @@
+"""
+Tests for creating and upgrading the database schema (schema.init_db)
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import schema
+
+# books as created before the unique (title, author) index and the version column
+OLD_BOOKS_TABLE = """
+    CREATE TABLE books (
+        id INTEGER NOT NULL PRIMARY KEY,
+        title VARCHAR(200) NOT NULL,
+        author VARCHAR(100) NOT NULL,
+        year INTEGER
+    )
+"""
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(OLD_BOOKS_TABLE))
+        conn.execute(text("CREATE INDEX ix_books_title ON books (title)"))
+        conn.execute(text("CREATE INDEX ix_books_author ON books (author)"))
+    yield engine
+    engine.dispose()
+
+
+def _insert(engine, *books):
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO books (title, author, year) VALUES (:title, :author, :year)"),
+            [{"title": title, "author": author, "year": 2000} for title, author in books],
+        )
+
+
+def test_upgrade_keeps_books_and_replaces_the_title_index(old_engine):
+    _insert(old_engine, ("Dune", "Frank Herbert"), ("Emma", "Jane Austen"))
+
+    schema.init_db(old_engine)
+    schema.init_db(old_engine)
+
+    indexes = {index["name"] for index in inspect(old_engine).get_indexes("books")}
+    assert "uq_books_title_author" in indexes
+    assert "ix_books_title" not in indexes
+    with old_engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, title, version FROM books ORDER BY id")).all()
+    assert [tuple(row) for row in rows] == [(1, "Dune", 1), (2, "Emma", 1)]
+
+
+def test_upgrade_with_duplicate_books_names_them(old_engine):
+    _insert(old_engine, ("Dune", "Frank Herbert"), ("Emma", "Jane Austen"), ("Dune", "Frank Herbert"))
+
+    with pytest.raises(schema.DuplicateBooksError, match=r"id=1 'Dune'.*id=3 'Dune'"):
+        schema.init_db(old_engine)
+
+    with old_engine.begin() as conn:
+        conn.execute(text("DELETE FROM books WHERE id = 3"))
+    schema.init_db(old_engine)
@@ -0,0 +1,81 @@
+"""
+Tests for the full-text search index (search_index) behind /books/search/
+"""
+
+from sqlalchemy import text
+
+import database
+import search_index
+from cache import response_cache
+
+
+def _titles(client, **params):
+    response = client.get("/books/search/", params=params)
+    assert response.status_code == 200, response.text
+    return [book["title"] for book in response.json()]
+
+
+def test_index_follows_inserts_updates_and_deletes(client, create_book):
+    dune = create_book("Dune")
+    create_book("Emma", author="Jane Austen")
+
+    assert _titles(client, title="dun") == ["Dune"]
+    assert _titles(client, author="austen") == ["Emma"]
+
+    client.put(f"/books/{dune['id']}", json={"title": "Children of Dune", "author": "Frank Herbert"})
+    assert _titles(client, title="children") == ["Children of Dune"]
+    assert _titles(client, author="herbert") == ["Children of Dune"]
+
+    client.put(f"/books/{dune['id']}", json={"title": "Emma Again"})
+    assert _titles(client, title="dune") == []
+    assert _titles(client, title="emma") == ["Emma Again", "Emma"]
+
+    client.delete(f"/books/{dune['id']}")
+    assert _titles(client, title="emma") == ["Emma"]
+
+
+def test_short_terms_fall_back_to_like(client, create_book):
+    create_book("It")
+    create_book("Dune")
+
+    assert _titles(client, title="iT") == ["It"]
+    assert _titles(client, title="t", ranked=True) == ["It"]
+
+
+def test_ranked_search_orders_by_relevance(client, create_book):
+    create_book("A Very Long Story About Many Things Including Dune")
+    create_book("Dune")
+    create_book("Emma")
+
+    assert _titles(client, title="dune", ranked=True) == [
+        "Dune", "A Very Long Story About Many Things Including Dune"
+    ]
+    assert _titles(client, title="dune") == [
+        "A Very Long Story About Many Things Including Dune", "Dune"
+    ]
+
+
+def test_ranked_search_cannot_use_a_cursor(client):
+    response = client.get("/books/search/", params={"title": "dune", "ranked": True, "after": "x"})
+
+    assert response.status_code == 400
+
+
+def test_rebuild_restores_a_stale_index(client, create_book):
+    book = create_book("Dune")
+    with database.get_engine().begin() as conn:
+        conn.execute(
+            text(
+                f"INSERT INTO {search_index.FTS_TABLE}({search_index.FTS_TABLE}, rowid, title, author) "
+                "VALUES ('delete', :id, :title, :author)"
+            ),
+            {"id": book["id"], "title": book["title"], "author": book["author"]},
+        )
+    response_cache.invalidate_all()
+    assert _titles(client, title="dune") == []
+
+    response = client.post("/books/search/rebuild")
+
+    assert response.status_code == 200
+    response_cache.invalidate_all()
+    assert _titles(client, title="dune") == ["Dune"]
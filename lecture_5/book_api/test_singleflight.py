@@ -0,0 +1,144 @@
+"""
+Tests for single-flight coalescing of identical concurrent reads
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cache import response_cache
+from singleflight import SingleFlight
+
+TIMEOUT = 5
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run_concurrently(flights, key, func, followers=4):
+    """Start a leader call, then followers while it is still running; returns their outcomes"""
+    started, release = threading.Event(), threading.Event()
+    outcomes = []
+
+    def blocking():
+        started.set()
+        assert release.wait(TIMEOUT)
+        return func()
+
+    def call():
+        try:
+            outcomes.append(("value", flights.do(key, blocking)))
+        except Exception as e:
+            outcomes.append(("error", e))
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    assert started.wait(TIMEOUT)
+
+    threads += [threading.Thread(target=call) for _ in range(followers)]
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for(lambda: flights.coalesced == followers)
+
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    return outcomes
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    executions = []
+
+    outcomes = _run_concurrently(flights, "key", lambda: executions.append(1) or "payload")
+
+    assert executions == [1]
+    assert outcomes == [("value", "payload")] * 5
+    assert flights.stats() == {"executions": 1, "coalesced": 4, "coalesced_ratio": 0.8}
+    assert flights.in_flight() == 0
+
+
+def test_error_is_raised_to_every_caller():
+    flights = SingleFlight()
+    error = RuntimeError("database is down")
+
+    def fail():
+        raise error
+
+    outcomes = _run_concurrently(flights, "key", fail)
+
+    assert outcomes == [("error", error)] * 5
+    assert flights.in_flight() == 0
+    assert flights.do("key", lambda: "recovered") == "recovered"
+
+
+def test_sequential_and_different_calls_are_not_coalesced():
+    flights = SingleFlight()
+
+    assert [flights.do(key, lambda key=key: key) for key in ("a", "a", "b")] == ["a", "a", "b"]
+    assert (flights.executions, flights.coalesced) == (3, 0)
+
+
+def test_async_calls_share_one_execution():
+    flights = SingleFlight()
+    executions = []
+
+    async def load():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return "payload"
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("key", load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["payload"] * 5
+    assert executions == [1]
+    assert (flights.executions, flights.coalesced) == (1, 4)
+    assert flights.in_flight() == 0
+
+
+def test_cancelled_async_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return "payload"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do_async("key", load))
+        second = asyncio.ensure_future(flights.do_async("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "payload"
+
+
+def test_cache_stats_report_single_flight(client):
+    client.get("/books/search/", params={"title": "dune"})
+
+    stats = client.get("/cache/stats").json()["single_flight"]
+
+    assert set(stats) == {"executions", "coalesced", "coalesced_ratio"}
+    assert stats["executions"] >= 1
+
+
+def test_search_revalidation_skips_the_query(client, create_book):
+    create_book("Dune")
+    etag = client.get("/books/search/", params={"title": "dune"}).headers["ETag"]
+    response_cache.invalidate_all()
+
+    response = client.get("/books/search/", params={"title": "dune"}, headers={"If-None-Match": etag})
+
+    # Only the table version is read, the search isn't run or coalesced
+    assert response.status_code == 304
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+    assert 'desc="0 rows"' in response.headers["Server-Timing"]
@@ -0,0 +1,86 @@
+"""
+Tests for the precomputed catalog statistics (/books/stats*)
+"""
+
+
+def _stats(client):
+    return (
+        client.get("/books/stats").json()["total"],
+        client.get("/books/stats/by-author").json(),
+        client.get("/books/stats/by-year").json(),
+    )
+
+
+def test_stats_count_created_books(client, create_book):
+    create_book("Dune", author="Frank Herbert", year=1965)
+    create_book("Children of Dune", author="Frank Herbert", year=1976)
+    create_book("Emma", author="Jane Austen", year=None)
+
+    total, by_author, by_year = _stats(client)
+
+    assert total == 3
+    assert by_author == [
+        {"author": "Frank Herbert", "count": 2},
+        {"author": "Jane Austen", "count": 1},
+    ]
+    assert by_year == [
+        {"year": None, "count": 1},
+        {"year": 1965, "count": 1},
+        {"year": 1976, "count": 1},
+    ]
+
+
+def test_stats_follow_updates_and_deletes(client, create_book):
+    dune = create_book("Dune", author="Frank Herbert", year=1965)
+    emma = create_book("Emma", author="Jane Austen", year=1815)
+
+    client.put(f"/books/{dune['id']}", json={"author": "Jane Austen", "year": 1815})
+    client.put(f"/books/{emma['id']}", json={"title": "Emma (2nd ed.)"})
+
+    assert _stats(client) == (
+        2,
+        [{"author": "Jane Austen", "count": 2}],
+        [{"year": 1815, "count": 2}],
+    )
+
+    client.delete(f"/books/{emma['id']}")
+
+    assert _stats(client) == (
+        1,
+        [{"author": "Jane Austen", "count": 1}],
+        [{"year": 1815, "count": 1}],
+    )
+
+
+def test_stats_follow_bulk_imports(client, create_book):
+    create_book("Dune", author="Frank Herbert", year=1965)
+
+    client.post("/books/bulk", json=[
+        {"title": "Emma", "author": "Jane Austen", "year": 1815},
+        {"title": "Persuasion", "author": "Jane Austen", "year": 1817},
+        {"title": "Dune", "author": "Frank Herbert", "year": 1965},
+    ])
+    client.post("/books/bulk", params={"on_conflict": "update"}, json=[
+        {"title": "Dune", "author": "Frank Herbert", "year": 1817},
+    ])
+
+    total, by_author, by_year = _stats(client)
+
+    assert total == 3
+    assert by_author == [
+        {"author": "Jane Austen", "count": 2},
+        {"author": "Frank Herbert", "count": 1},
+    ]
+    assert by_year == [{"year": 1815, "count": 1}, {"year": 1817, "count": 2}]
+
+
+def test_stats_pages(client, create_book):
+    for year in (2001, 2002, 2003):
+        create_book(f"Book {year}", author=f"Author {year}", year=year)
+
+    assert client.get("/books/stats/by-year", params={"skip": 1, "limit": 1}).json() == [
+        {"year": 2002, "count": 1}
+    ]
+    assert [row["author"] for row in client.get("/books/stats/by-author", params={"limit": 2}).json()] == [
+        "Author 2001", "Author 2002"
+    ]
@@ -0,0 +1,124 @@
+"""
+Tests for ETags, conditional GETs (304) and If-Match preconditions (412)
+"""
+
+import pytest
+
+import versioning
+from cache import response_cache
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"book-1-2"', True),
+    ('W/"book-1-2"', True),
+    ('"book-1-1", "book-1-2"', True),
+    ("*", True),
+    ('"book-1-1"', False),
+    ("book-1-2", False),
+    ("", False),
+    (None, False),
+])
+def test_matches(header, expected):
+    assert versioning.matches(header, '"book-1-2"') is expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"book-1-2"', True),
+    ('"book-1-1", "book-1-2"', True),
+    ("*", True),
+    ('W/"book-1-2"', False),
+])
+def test_strong_matches(header, expected):
+    assert versioning.matches(header, '"book-1-2"', weak=False) is expected
+
+
+def test_deleted_book_etag_is_not_reused(client, create_book):
+    create_book("Alpha")
+    deleted = create_book("Beta")
+    etag = client.get(f"/books/{deleted['id']}").headers["ETag"]
+    client.delete(f"/books/{deleted['id']}")
+
+    book = create_book("Gamma")
+
+    assert book["id"] != deleted["id"]
+    assert client.get(f"/books/{book['id']}", headers={"If-None-Match": etag}).status_code == 200
+    assert client.put(f"/books/{book['id']}", json={"year": 1999}, headers={"If-Match": etag}).status_code == 412
+
+
+def test_book_etag_changes_on_update(client, create_book):
+    book = create_book("Dune")
+    etag = client.get(f"/books/{book['id']}").headers["ETag"]
+
+    updated = client.put(f"/books/{book['id']}", json={"year": 1966})
+
+    assert updated.headers["ETag"] != etag
+    assert client.get(f"/books/{book['id']}").headers["ETag"] == updated.headers["ETag"]
+
+
+def test_conditional_get_of_a_book(client, create_book):
+    book = create_book("Dune")
+    etag = client.get(f"/books/{book['id']}").headers["ETag"]
+
+    # Answered from the cache, then from the database
+    for _ in range(2):
+        response = client.get(f"/books/{book['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        response_cache.invalidate_all()
+
+    client.put(f"/books/{book['id']}", json={"year": 1966})
+    assert client.get(f"/books/{book['id']}", headers={"If-None-Match": etag}).status_code == 200
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/books", {}),
+    ("/books/search/", {"title": "dune"}),
+])
+def test_conditional_get_of_a_list(client, create_book, path, params):
+    create_book("Dune")
+    etag = client.get(path, params=params).headers["ETag"]
+
+    assert client.get(path, params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    create_book("Dune Messiah")
+    response = client.get(path, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_list_etag_depends_on_the_query(client, create_book):
+    create_book("Dune")
+    assert client.get("/books", params={"limit": 1}).headers["ETag"] != client.get("/books").headers["ETag"]
+
+
+def test_update_with_current_etag(client, create_book):
+    book = create_book("Dune")
+    etag = client.get(f"/books/{book['id']}").headers["ETag"]
+
+    response = client.put(f"/books/{book['id']}", json={"year": 1966}, headers={"If-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["year"] == 1966
+
+
+def test_weak_etag_fails_if_match(client, create_book):
+    book = create_book("Dune")
+    etag = client.get(f"/books/{book['id']}").headers["ETag"]
+
+    response = client.put(f"/books/{book['id']}", json={"year": 1966}, headers={"If-Match": f"W/{etag}"})
+
+    assert response.status_code == 412
+
+
+@pytest.mark.parametrize("method", ["put", "delete"])
+def test_stale_etag_is_a_failed_precondition(client, create_book, method):
+    book = create_book("Dune", year=1965)
+    etag = client.get(f"/books/{book['id']}").headers["ETag"]
+    client.put(f"/books/{book['id']}", json={"year": 1966})
+
+    kwargs = {"json": {"year": 1967}} if method == "put" else {}
+    response = client.request(method.upper(), f"/books/{book['id']}", headers={"If-Match": etag}, **kwargs)
+
+    assert response.status_code == 412
+    assert client.get(f"/books/{book['id']}").json()["year"] == 1966
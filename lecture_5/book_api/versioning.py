@@ -0,0 +1,118 @@
+"""
+Row and table versions of the books catalog, and the ETags built from them.
+
+Every book carries a `version` column bumped on each update, which gives
+GET /books/{id} a strong ETag and PUT/DELETE optimistic concurrency via
+If-Match. List endpoints use a table-level version kept in `catalog_meta`
+by triggers, so a conditional GET can be answered with 304 after reading a
+single counter instead of the result set.
+"""
+
+import hashlib
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import inspect, select, text
+import models
+
+TABLE_VERSION_KEY = "books_version"
+
+TABLE_VERSION_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_version_{event.lower()} AFTER {event} ON books BEGIN
+        UPDATE catalog_meta SET value = value + 1 WHERE key = '{TABLE_VERSION_KEY}';
+    END
+    """
+    for event in ("INSERT", "UPDATE", "DELETE")
+]
+
+table_version_query = (
+    select(models.catalog_meta.c.value)
+    .where(models.catalog_meta.c.key == TABLE_VERSION_KEY)
+)
+
+
+def ensure_versioning(engine):
+    """
+    Add the version column and table version counter to an existing database.
+
+    Tables created by create_all() already have the column; older databases
+    get it with ALTER TABLE. The table version triggers are SQLite only,
+    elsewhere list responses are sent without an ETag.
+    """
+    with engine.begin() as conn:
+        columns = {column["name"] for column in inspect(conn).get_columns("books")}
+        if "version" not in columns:
+            conn.execute(text(
+                "ALTER TABLE books ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+            ))
+
+        if engine.dialect.name != "sqlite":
+            return
+
+        conn.execute(text(
+            "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES (:key, 0)"
+        ), {"key": TABLE_VERSION_KEY})
+
+        for statement in TABLE_VERSION_TRIGGERS:
+            conn.execute(text(statement))
+
+
+def book_etag(book_id, version):
+    """Strong ETag of one book"""
+    return f'"book-{book_id}-{version}"'
+
+
+def list_etag(table_version, cache_key):
+    """
+    Strong ETag of a list response.
+
+    Returns None when the table version is unknown (no triggers).
+    """
+    if table_version is None:
+        return None
+    digest = hashlib.sha1(cache_key.encode()).hexdigest()[:16]
+    return f'"books-{table_version}-{digest}"'
+
+
+def matches(header, etag, weak=True):
+    """
+    Check an If-None-Match / If-Match header value against an ETag.
+
+    If-None-Match uses the weak comparison (W/"x" matches "x"), If-Match
+    must use the strong one (weak=False), where a weak ETag never matches.
+    """
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (value.strip() for value in header.split(","))
+    if not weak:
+        return etag in candidates
+    return etag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+
+def not_modified(etag):
+    """Empty 304 response for a matching If-None-Match"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def respond(payload, if_none_match):
+    """Send a cached payload, or 304 if the client already has it"""
+    etag = payload.headers.get("ETag")
+    if matches(if_none_match, etag):
+        return not_modified(etag)
+    return payload.to_response()
+
+
+def check_if_match(if_match, book):
+    """
+    Enforce an If-Match precondition before changing a book.
+
+    Raises:
+        HTTPException: 412 if the book has changed since the client read it
+    """
+    if if_match and not matches(if_match, book_etag(book.id, book.version), weak=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Book with ID {book.id} has been modified"
+        )
@@ -1,7 +1,68 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+from fastapi import FastAPI, Response, status
+
+import probes
+
+# Database to probe, the Book API's DATABASE_URL; without it there is
+# nothing to check and the service is ready as soon as the probes have run
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+probe_runner = probes.ProbeRunner()
+
+
+def create_probe_engine(url):
+    """Engine for the database probe, which needs a single connection"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import NullPool, QueuePool
+
+    url = make_url(url.replace("postgres://", "postgresql://", 1))
+    # Only QueuePool takes a size; other dialect pools (SQLite in-memory
+    # URLs get a per-thread one) are replaced by a connection per probe
+    if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        return create_engine(url, pool_size=1, max_overflow=0)
+    return create_engine(url, poolclass=NullPool)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine = None
+    if DATABASE_URL:
+        engine = create_probe_engine(DATABASE_URL)
+        probe_runner.register("database", probes.database_probe(engine))
+
+    probe_runner.start()
+    yield
+    await probe_runner.stop()
+    if engine is not None:
+        engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/healthcheck")
 async def healthcheck() -> dict:
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/livez")
+async def livez() -> dict:
+    """Liveness: the event loop answers and the probe task is running"""
+    if not probe_runner.alive():
+        return Response(
+            content=b'{"status":"probe task stopped"}',
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            media_type="application/json",
+        )
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz() -> Response:
+    """Readiness from the last background probe round, without touching dependencies"""
+    ready, body = probe_runner.readiness()
+    return Response(
+        content=body,
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        media_type="application/json",
+    )
@@ -0,0 +1,167 @@
+"""
+Background dependency probes for the readiness endpoint.
+
+Probes (a database `SELECT 1`, ...) run in an asyncio task every PROBE_INTERVAL seconds, blocking ones in a worker
+thread with a timeout, and the outcome is stored as a ready-made JSON
+body. /readyz only returns that body, so probe traffic from an
+orchestrator never touches the database or competes with real requests.
+
+Failed checks carry a short reason (the message of a ProbeFailed, else
+only the exception type); the exception itself is logged on the "probes"
+logger when a probe starts failing, and recovery is logged too.
+
+Settings (environment variables):
+    PROBE_INTERVAL          Seconds between probe rounds (default: 5)
+    PROBE_TIMEOUT           Seconds a probe may take before it fails (default: 2)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+
+PROBE_INTERVAL = float(os.getenv("PROBE_INTERVAL", 5))
+PROBE_TIMEOUT = float(os.getenv("PROBE_TIMEOUT", 2))
+
+# Results are stale, and the service not ready, once this many rounds are missed
+STALE_ROUNDS = 3
+
+logger = logging.getLogger("probes")
+
+
+class ProbeFailed(Exception):
+    """Raised by a probe when its dependency isn't usable, with a reason safe to report"""
+
+
+def database_probe(engine):
+    """Probe running SELECT 1 on a pooled connection of a SQLAlchemy engine"""
+    from sqlalchemy import text
+
+    def probe():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return "SELECT 1 ok"
+
+    return probe
+
+
+class ProbeRunner:
+    """
+    Runs registered probes on an interval and caches the readiness report.
+
+    Args:
+        interval (float): Seconds between probe rounds
+        timeout (float): Seconds a blocking probe may take
+    """
+
+    def __init__(self, interval=PROBE_INTERVAL, timeout=PROBE_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self._probes = {}
+        self._running = set()
+        self._failing = set()
+        self._task = None
+        self._checked_at = None
+        self._ready = False
+        self._body = json.dumps({"status": "starting", "checks": {}}).encode()
+
+    def register(self, name, probe, blocking=True):
+        """
+        Add a probe: a callable returning a detail string, or raising if the
+        dependency isn't usable. Blocking probes run in a worker thread.
+        """
+        self._probes[name] = (probe, blocking)
+
+    async def _run_probe(self, name, probe, blocking):
+        # A blocking probe still running from an earlier round (e.g. waiting
+        # for a connection) fails instead of starting another thread
+        if name in self._running:
+            return False, "previous probe still running"
+
+        start = time.perf_counter()
+        try:
+            if blocking:
+                self._running.add(name)
+                future = asyncio.ensure_future(asyncio.to_thread(probe))
+                future.add_done_callback(lambda _: self._running.discard(name))
+                detail = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            else:
+                detail = probe()
+            ok = True
+        except asyncio.TimeoutError:
+            ok, detail = False, f"timed out after {self.timeout}s"
+            self._log_failure(name, detail)
+        except ProbeFailed as e:
+            ok, detail = False, str(e) or "failed"
+            self._log_failure(name, detail)
+        except Exception as e:
+            # Exception messages can hold hosts, users or SQL: log them, but
+            # only report the type
+            ok, detail = False, type(e).__name__
+            self._log_failure(name, detail, e)
+
+        return ok, f"{detail} ({(time.perf_counter() - start) * 1000:.1f} ms)"
+
+    def _log_failure(self, name, detail, exc=None):
+        # Once per outage, not every round
+        if name not in self._failing:
+            logger.warning("Probe %r failed: %s", name, detail, exc_info=exc)
+
+    async def run_once(self):
+        """Run every probe once, concurrently, and cache the report"""
+        names = list(self._probes)
+        outcomes = await asyncio.gather(
+            *(self._run_probe(name, *self._probes[name]) for name in names)
+        )
+
+        checks = {
+            name: {"ok": ok, "detail": detail} for name, (ok, detail) in zip(names, outcomes)
+        }
+        failing = {name for name, (ok, _) in zip(names, outcomes) if not ok}
+        for name in self._failing - failing:
+            logger.info("Probe %r recovered", name)
+        self._failing = failing
+
+        self._ready = all(ok for ok, _ in outcomes)
+        self._body = json.dumps(
+            {"status": "ready" if self._ready else "not ready", "checks": checks}
+        ).encode()
+        self._checked_at = time.monotonic()
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start probing in the background (call from the running event loop)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def alive(self):
+        """False if the probe task has died"""
+        return self._task is not None and not self._task.done()
+
+    def readiness(self):
+        """
+        Cached readiness report.
+
+        Returns:
+            tuple: (ready, JSON body); not ready before the first round or
+            when the last round is more than STALE_ROUNDS intervals old
+        """
+        if self._checked_at is None:
+            return False, self._body
+        if time.monotonic() - self._checked_at > STALE_ROUNDS * self.interval + self.timeout:
+            return False, json.dumps({"status": "stale", "checks": {}}).encode()
+        return self._ready, self._body